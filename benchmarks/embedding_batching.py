@@ -0,0 +1,76 @@
+"""Benchmark fixed-count vs. token-budget embedding batching.
+
+Loads and chunks the sample documents, then embeds the chunks with each
+batching strategy and reports throughput. Run from the project root:
+
+    python -m benchmarks.embedding_batching
+"""
+
+import time
+from pathlib import Path
+
+import click
+import numpy as np
+
+from src.config.settings import config
+from src.indexing.file_loader import FileLoader
+from src.indexing.chunker import TextChunker
+from src.indexing.embedder import TextEmbedder
+
+def _load_chunks(documents_dir: Path):
+    """Load and chunk every supported file in a directory."""
+    loader = FileLoader()
+    chunker = TextChunker()
+    chunks = []
+    
+    for file_path in sorted(documents_dir.iterdir()):
+        if file_path.suffix.lower() not in loader.get_supported_extensions():
+            continue
+        document = loader.load_file(file_path)
+        if document and document.get("content"):
+            chunks.extend(chunker.chunk_document(document))
+    
+    return chunks
+
+@click.command()
+@click.option('--documents', '-d', default='data/documents', help='Directory of sample documents')
+@click.option('--repeat', '-r', default=3, help='Timed runs per strategy')
+def main(documents, repeat):
+    """Compare embedding throughput of fixed and token-budget batching."""
+    # Measure model forward passes, not cache hits
+    config.embeddings.setdefault("cache", {})["enabled"] = False
+    
+    chunks = _load_chunks(Path(documents))
+    texts = [chunk["content"] for chunk in chunks]
+    if not texts:
+        raise click.ClickException(f"No chunks produced from {documents}")
+    
+    embedder = TextEmbedder()
+    embedder.cache.enabled = False
+    total_tokens = sum(len(ids) for ids in embedder.tokenizer(texts, add_special_tokens=False)["input_ids"])
+    click.echo(f"{len(texts)} chunks, {total_tokens} tokens from {documents}")
+    
+    results = {}
+    for strategy in ("fixed", "token_budget"):
+        embedder.batching = strategy
+        embedder.embed_batch(texts[:8])  # Warm up
+        
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            embeddings = embedder.embed_batch(texts)
+            timings.append(time.perf_counter() - start)
+        
+        best = min(timings)
+        results[strategy] = (best, np.vstack(embeddings))
+        click.echo(f"{strategy:>13}: {best:.2f}s best of {repeat}, "
+                   f"{len(texts) / best:.1f} chunks/s, {total_tokens / best:.0f} tokens/s")
+    
+    fixed_time, fixed_vectors = results["fixed"]
+    budget_time, budget_vectors = results["token_budget"]
+    agreement = np.sum(fixed_vectors * budget_vectors, axis=1)
+    click.echo(f"Speedup: {fixed_time / budget_time:.2f}x")
+    click.echo(f"Cosine agreement between strategies: min {agreement.min():.5f}, mean {agreement.mean():.5f}")
+
+if __name__ == "__main__":
+    main()
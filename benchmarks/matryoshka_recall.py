@@ -0,0 +1,116 @@
+"""Measure recall and latency of Matryoshka search with full-dimension rescoring.
+
+Embeds the sample document chunks, loads them into scratch Qdrant
+collections and runs each query through QdrantManager.search_similar: once
+against a plain full-dimension collection, and once per truncation
+dimension against a collection with the Matryoshka named-vector layout
+(truncated HNSW vector in RAM, full vector on disk for rescoring). Recall is
+measured against exact full-dimension search. Needs a running Qdrant; the
+scratch collections are dropped afterwards unless --keep is given. Small
+corpora stay below Qdrant's indexing threshold and are searched
+exhaustively, so use a realistic document set. Run from the project root:
+
+    python -m benchmarks.matryoshka_recall
+"""
+
+import random
+import time
+from pathlib import Path
+
+import click
+import numpy as np
+from qdrant_client.models import CollectionStatus
+
+from src.config.settings import config
+from src.indexing.embedder import TextEmbedder
+from benchmarks.embedding_batching import _load_chunks
+
+def _make_queries(texts, count: int, seed: int):
+    """Use the opening words of random chunks as queries."""
+    rng = random.Random(seed)
+    sample = rng.sample(texts, min(count, len(texts)))
+    return [" ".join(text.split()[:12]) for text in sample]
+
+def _load_collection(collection_name: str, matryoshka_dim, chunks, embeddings):
+    """Create a scratch collection with the given layout and upload the chunks into it."""
+    from src.storage.qdrant_client import QdrantManager
+
+    config.qdrant["collection_name"] = collection_name
+    config.qdrant["matryoshka"] = {
+        "enabled": matryoshka_dim is not None,
+        "dim": matryoshka_dim or 0,
+        "oversample": 1
+    }
+    manager = QdrantManager()
+    if not manager.add_chunks(chunks, embeddings):
+        raise click.ClickException(f"Failed to upload chunks into {collection_name}")
+
+    # Wait until every point is stored and the optimizer is done, so searches see the final index
+    while (manager.client.count(collection_name, exact=True).count < len(chunks)
+           or manager.client.get_collection(collection_name).status != CollectionStatus.GREEN):
+        time.sleep(1)
+    return manager
+
+def _measure(manager, query_vectors, truth, k: int, hnsw_ef):
+    """Run every query through search_similar, returning (recall@k, ms per query)."""
+    hits = 0
+    start = time.perf_counter()
+    for query, expected in zip(query_vectors, truth):
+        results = manager.search_similar(query, limit=k, score_threshold=-1.0, hnsw_ef=hnsw_ef)
+        hits += len(expected.intersection(result["chunk_id"] for result in results))
+    latency_ms = (time.perf_counter() - start) * 1000 / len(query_vectors)
+    return hits / (k * len(query_vectors)), latency_ms
+
+@click.command()
+@click.option('--documents', '-d', default='data/documents', help='Directory of sample documents')
+@click.option('--queries', '-q', default=100, help='Number of queries sampled from the chunks')
+@click.option('--k', default=10, help='Results per query')
+@click.option('--dims', default='128,256,512', help='Comma-separated truncation dimensions')
+@click.option('--oversample', default='1,2,4,8', help='Comma-separated oversampling factors')
+@click.option('--hnsw-ef', default=None, type=int, help='Search-time HNSW ef, default from the storage profile')
+@click.option('--collection', default='optimaize_matryoshka_bench', help='Prefix for the scratch collections')
+@click.option('--keep', is_flag=True, help='Keep the scratch collections')
+@click.option('--seed', default=0, help='Query sampling seed')
+def main(documents, queries, k, dims, oversample, hnsw_ef, collection, keep, seed):
+    """Report recall@k and per-query latency of search_similar for each dimension and oversampling factor."""
+    config.embeddings.setdefault("cache", {})["enabled"] = False
+    # Importing qdrant_client creates the global manager; point it at a scratch collection
+    config.qdrant["collection_name"] = f"{collection}_full"
+    config.qdrant["matryoshka"] = {"enabled": False}
+
+    chunks = _load_chunks(Path(documents))
+    if len(chunks) <= k:
+        raise click.ClickException(f"Need more than {k} chunks, got {len(chunks)} from {documents}")
+
+    embedder = TextEmbedder()
+    embeddings = embedder.embed_chunk_matrix(chunks)
+    texts = [chunk["content"] for chunk in chunks]
+    query_vectors = embedder.embed_matrix(_make_queries(texts, queries, seed))
+    click.echo(f"{len(chunks)} chunks, {len(query_vectors)} queries, k={k}, full dim {embeddings.shape[1]}")
+
+    # Ground truth: exact full-dimension search
+    chunk_ids = np.array([chunk["chunk_id"] for chunk in chunks])
+    truth = [set(chunk_ids[np.argsort(-(embeddings @ query))[:k]]) for query in query_vectors]
+
+    managers = []
+    try:
+        manager = _load_collection(f"{collection}_full", None, chunks, embeddings)
+        managers.append(manager)
+        recall, latency_ms = _measure(manager, query_vectors, truth, k, hnsw_ef)
+        click.echo(f"{'full':>6}: recall@{k} {recall:.3f}, {latency_ms:.3f} ms/query")
+
+        for dim in [int(d) for d in dims.split(",")]:
+            manager = _load_collection(f"{collection}_d{dim}", dim, chunks, embeddings)
+            managers.append(manager)
+
+            for factor in [int(f) for f in oversample.split(",")]:
+                manager.matryoshka_oversample = factor
+                recall, latency_ms = _measure(manager, query_vectors, truth, k, hnsw_ef)
+                click.echo(f"{dim:>6}: oversample {factor}x, recall@{k} {recall:.3f}, {latency_ms:.3f} ms/query")
+    finally:
+        if not keep:
+            for manager in managers:
+                manager.client.delete_collection(manager.collection_name)
+
+if __name__ == "__main__":
+    main()
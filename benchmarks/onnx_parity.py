@@ -0,0 +1,64 @@
+"""Compare the ONNX Runtime embedding backend against torch.
+
+Embeds the sample document chunks with both backends and reports
+throughput and cosine agreement. Run from the project root:
+
+    python -m benchmarks.onnx_parity
+"""
+
+import time
+from pathlib import Path
+
+import click
+import numpy as np
+
+from src.config.settings import config
+from src.indexing.embedder import TextEmbedder
+from benchmarks.embedding_batching import _load_chunks
+
+def _time_backend(backend: str, texts, repeat: int):
+    """Embed texts with one backend, returning the best time and the vectors."""
+    config.embeddings["backend"] = backend
+    embedder = TextEmbedder()
+    embedder.model  # Load now so a fallback to torch is visible
+    if embedder.backend != backend:
+        raise click.ClickException(f"Backend {backend} could not be loaded")
+    embedder.cache.enabled = False
+    embedder.embed_batch(texts[:8])  # Warm up
+    
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        embeddings = embedder.embed_batch(texts)
+        timings.append(time.perf_counter() - start)
+    
+    return min(timings), np.vstack(embeddings)
+
+@click.command()
+@click.option('--documents', '-d', default='data/documents', help='Directory of sample documents')
+@click.option('--repeat', '-r', default=3, help='Timed runs per backend')
+@click.option('--quantize/--no-quantize', default=True, help='Use the int8 ONNX model')
+def main(documents, repeat, quantize):
+    """Compare throughput and cosine agreement of the torch and ONNX backends."""
+    config.embeddings.setdefault("cache", {})["enabled"] = False
+    config.embeddings.setdefault("onnx", {})["quantize"] = quantize
+    
+    texts = [chunk["content"] for chunk in _load_chunks(Path(documents))]
+    if not texts:
+        raise click.ClickException(f"No chunks produced from {documents}")
+    click.echo(f"{len(texts)} chunks from {documents}")
+    
+    results = {}
+    for backend in ("torch", "onnx"):
+        best, vectors = _time_backend(backend, texts, repeat)
+        results[backend] = (best, vectors)
+        click.echo(f"{backend:>5}: {best:.2f}s best of {repeat}, {len(texts) / best:.1f} chunks/s")
+    
+    torch_time, torch_vectors = results["torch"]
+    onnx_time, onnx_vectors = results["onnx"]
+    agreement = np.sum(torch_vectors * onnx_vectors, axis=1)
+    click.echo(f"Speedup: {torch_time / onnx_time:.2f}x ({'int8' if quantize else 'fp32'})")
+    click.echo(f"Cosine agreement with torch: min {agreement.min():.5f}, mean {agreement.mean():.5f}")
+
+if __name__ == "__main__":
+    main()
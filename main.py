@@ -9,7 +9,8 @@ from pathlib import Path
 # Set environment variables before importing other modules
 os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
 
-from src.indexing.pipeline import indexing_pipeline
+# The pipeline (and its storage connections) is imported inside the commands
+# that use it, so spawned worker processes re-importing this module stay light
 from src.utils.logger import logger
 from src.config.settings import config
 
@@ -120,6 +121,8 @@ def ask(question, mode, top_k, min_similarity, model, temperature, max_tokens, s
 def index(force, input_dir, batch_size):
     """Run the indexing pipeline on documents."""
     try:
+        from src.indexing.pipeline import indexing_pipeline
+        
         # Override config if specified
         overrides = {}
         if input_dir:
@@ -155,11 +158,95 @@ def index(force, input_dir, batch_size):
         click.echo(f"❌ Error: {e}")
         raise click.Abort()
 
+@cli.command()
+def rebuild():
+    """Reindex everything into a new generation and switch searches to it when done."""
+    try:
+        from src.indexing.pipeline import indexing_pipeline
+        
+        result = indexing_pipeline.rebuild()
+        
+        click.echo("\n" + "=" * 50)
+        click.echo("REBUILD RESULTS")
+        click.echo("=" * 50)
+        click.echo(f"Status: {result['status']}")
+        click.echo(f"Files processed: {result['files_processed']}")
+        click.echo(f"Chunks created: {result['chunks_created']}")
+        
+        if result['status'] == 'completed':
+            click.echo(f"Qdrant: {result['qdrant_flip']['alias']} -> {result['qdrant_flip']['collection']}")
+            click.echo(f"Elasticsearch: {result['elasticsearch_flip']['alias']} -> {result['elasticsearch_flip']['index']}")
+            click.echo("\n✅ Rebuild is live!")
+        else:
+            if result.get('error'):
+                click.echo(f"Error: {result['error']}")
+            click.echo("\n⚠️  Rebuild aborted, the current index is still live")
+        
+        if result.get('failed_files'):
+            click.echo(f"\n❌ Failed files ({len(result['failed_files'])}):")
+            for failed_file in result['failed_files']:
+                click.echo(f"  - {failed_file}")
+    
+    except Exception as e:
+        logger.error(f"CLI rebuild failed: {e}")
+        click.echo(f"❌ Error: {e}")
+        raise click.Abort()
+
+@cli.command()
+def migrate_alias():
+    """Move a plain Qdrant collection behind an alias so blue/green rebuilds can replace it."""
+    try:
+        from src.storage.qdrant_client import qdrant_manager
+        
+        result = qdrant_manager.migrate_legacy_collection()
+        click.echo(f"✅ {result['alias']} -> {result['collection']} ({result['points']} points)")
+    
+    except Exception as e:
+        logger.error(f"CLI migrate-alias failed: {e}")
+        click.echo(f"❌ Error: {e}")
+        raise click.Abort()
+
+@cli.command()
+def migrate_storage():
+    """Update the Qdrant collection to match the configured storage profile."""
+    try:
+        from src.storage.qdrant_client import qdrant_manager
+        
+        changes = qdrant_manager.apply_storage_profile()
+        if changes:
+            click.echo(f"✅ Updated {qdrant_manager.collection_name}: {', '.join(sorted(changes))}")
+            click.echo("Qdrant rebuilds the affected segments in the background")
+        else:
+            click.echo(f"{qdrant_manager.collection_name} already matches the storage profile")
+    
+    except Exception as e:
+        logger.error(f"CLI migrate-storage failed: {e}")
+        click.echo(f"❌ Error: {e}")
+        raise click.Abort()
+
+@cli.command()
+def restore_refresh():
+    """Re-enable Elasticsearch refresh left disabled by an interrupted indexing run."""
+    try:
+        from src.storage.elasticsearch_client import elasticsearch_manager
+        
+        if elasticsearch_manager.restore_refresh_interval():
+            click.echo(f"✅ Refresh restored on {elasticsearch_manager.index_name}")
+        else:
+            click.echo(f"Refresh was not changed on {elasticsearch_manager.index_name}")
+    
+    except Exception as e:
+        logger.error(f"CLI restore-refresh failed: {e}")
+        click.echo(f"❌ Error: {e}")
+        raise click.Abort()
+
 @cli.command()
 @click.option('--json-output', '-j', is_flag=True, help='Output as JSON')
 def status(json_output):
     """Show pipeline status and statistics."""
     try:
+        from src.indexing.pipeline import indexing_pipeline
+        
         status_info = indexing_pipeline.get_pipeline_status()
         
         if json_output:
@@ -177,6 +264,8 @@ def status(json_output):
 def reprocess(file_path):
     """Reprocess a single file."""
     try:
+        from src.indexing.pipeline import indexing_pipeline
+        
         file_path = Path(file_path)
         result = indexing_pipeline.process_single_file(file_path, force=True)
         
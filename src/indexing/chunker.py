@@ -1,44 +1,94 @@
 """Text chunking utilities for OptimAIze."""
 
 import uuid
-from typing import List, Dict, Any
+from bisect import bisect_left
+from typing import List, Dict, Any, Tuple, Optional
 import tiktoken
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from src.config.settings import config
 from src.utils.logger import logger
 
+class ModelTokenizer:
+    """Adapter exposing an embedding model's Hugging Face tokenizer to TextChunker."""
+    
+    def __init__(self, hf_tokenizer, model_name: str):
+        self.hf_tokenizer = hf_tokenizer
+        self.model_name = model_name
+    
+    def encode(self, text: str, disallowed_special=()) -> List[int]:
+        """Encode text to token IDs without special tokens."""
+        return self.hf_tokenizer(text, add_special_tokens=False, verbose=False)["input_ids"]
+    
+    def encode_with_offsets(self, text: str) -> Tuple[List[int], List[int]]:
+        """Encode text, returning token IDs and each token's start character offset."""
+        encoding = self.hf_tokenizer(
+            text,
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            verbose=False
+        )
+        return encoding["input_ids"], [start for start, _ in encoding["offset_mapping"]]
+
 class TextChunker:
     """Text chunking with sentence-aware splitting and token counting."""
     
-    def __init__(self):
+    def __init__(self, embedder=None):
         self.chunk_size = config.indexing.get("chunk_size", 512)
         self.chunk_overlap = config.indexing.get("chunk_overlap", 50)
+        self.chunking_mode = config.indexing.get("chunking_mode", "recursive")  # recursive, token_offset
+        self.tokenizer_source = config.indexing.get("tokenizer", "tiktoken")  # tiktoken, embedding_model
         
         # Initialize tokenizer for accurate token counting
-        try:
-            self.tokenizer = tiktoken.get_encoding("cl100k_base")  # GPT-4 tokenizer
-        except Exception as e:
-            logger.warning(f"Could not load tiktoken encoder: {e}. Using character-based approximation.")
-            self.tokenizer = None
+        self.tokenizer = None
+        if self.tokenizer_source == "embedding_model":
+            self.tokenizer = self._load_model_tokenizer(embedder)
+        
+        if self.tokenizer is None:
+            try:
+                self.tokenizer = tiktoken.get_encoding("cl100k_base")  # GPT-4 tokenizer
+            except Exception as e:
+                logger.warning(f"Could not load tiktoken encoder: {e}. Using character-based approximation.")
+                self.tokenizer = None
+        
+        # Token IDs can only be reused by the embedder when they come from its own tokenizer
+        self.produces_model_tokens = isinstance(self.tokenizer, ModelTokenizer)
+        
+        if self.chunking_mode == "token_offset" and self.tokenizer is None:
+            logger.warning("token_offset chunking requires a tokenizer, falling back to recursive chunking")
+            self.chunking_mode = "recursive"
+        
+        self.separators = [
+            "\n\n",  # Paragraph breaks
+            "\n",    # Line breaks
+            " ",     # Word breaks
+            ".",     # Sentence breaks
+            "!",     # Exclamation breaks
+            "?",     # Question breaks
+            ";",     # Semicolon breaks
+            ",",     # Comma breaks
+            ""       # Character breaks (fallback)
+        ]
         
         # Initialize text splitter
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=self.chunk_size * 4,  # Approximate char to token ratio
             chunk_overlap=self.chunk_overlap * 4,
             length_function=self._token_length,
-            separators=[
-                "\n\n",  # Paragraph breaks
-                "\n",    # Line breaks
-                " ",     # Word breaks
-                ".",     # Sentence breaks
-                "!",     # Exclamation breaks
-                "?",     # Question breaks
-                ";",     # Semicolon breaks
-                ",",     # Comma breaks
-                ""       # Character breaks (fallback)
-            ]
+            separators=self.separators
         )
     
+    def _load_model_tokenizer(self, embedder) -> Optional[ModelTokenizer]:
+        """Get the embedding model's tokenizer, or None if unavailable."""
+        if embedder is None:
+            logger.warning("Embedding model tokenizer requested without an embedder, using tiktoken")
+            return None
+        
+        try:
+            return ModelTokenizer(embedder.tokenizer, embedder.model_name)
+        except Exception as e:
+            logger.warning(f"Could not load embedding model tokenizer: {e}. Using tiktoken.")
+            return None
+    
     def _token_length(self, text: str) -> int:
         """Calculate token length of text."""
         if self.tokenizer:
@@ -47,6 +97,108 @@ class TextChunker:
             # Fallback: approximate 4 characters per token
             return len(text) // 4
     
+    def _encode_with_offsets(self, text: str) -> Tuple[List[int], List[int]]:
+        """Tokenize text once, returning token IDs and each token's start character offset."""
+        if isinstance(self.tokenizer, ModelTokenizer):
+            return self.tokenizer.encode_with_offsets(text)
+        
+        tokens = self.tokenizer.encode(text, disallowed_special=())
+        _, offsets = self.tokenizer.decode_with_offsets(tokens)
+        return tokens, offsets
+    
+    def _split_text(self, text: str) -> List[Tuple[str, int, Optional[List[int]]]]:
+        """Split text into (chunk_text, token_count, token_ids) using the configured mode.
+        
+        token_ids is only set when chunks are tokenized with the embedding
+        model's tokenizer, so the embedder can skip tokenizing them again.
+        """
+        if self.chunking_mode == "token_offset":
+            return self._split_by_token_offsets(text)
+        
+        chunks = []
+        for chunk_text in self.text_splitter.split_text(text):
+            if self.produces_model_tokens:
+                token_ids = self.tokenizer.encode(chunk_text)
+                chunks.append((chunk_text, len(token_ids), token_ids))
+            else:
+                chunks.append((chunk_text, self._token_length(chunk_text), None))
+        return chunks
+    
+    def _split_by_token_offsets(self, text: str) -> List[Tuple[str, int, Optional[List[int]]]]:
+        """Split text in a single tokenization pass.
+        
+        Chunks of up to chunk_size tokens are cut at the best separator found
+        in their second half, and overlaps start at a separator boundary. The
+        token offset map turns these character positions back into token counts,
+        so chunk text is never re-encoded.
+        """
+        tokens, offsets = self._encode_with_offsets(text)
+        token_count = len(tokens)
+        offsets = list(offsets) + [len(text)]  # Sentinel for the end of the text
+        
+        chunk_size = max(self.chunk_size, 1)
+        overlap = min(max(self.chunk_overlap, 0), chunk_size - 1)
+        
+        chunks = []
+        start = 0
+        while start < token_count:
+            end = min(start + chunk_size, token_count)
+            if end < token_count:
+                end = self._find_cut(text, offsets, start, end)
+            
+            # Drop whitespace-only tokens at the edges so the token IDs and
+            # count match the stripped chunk text
+            first, last = start, end
+            while first < last and not text[offsets[first]:offsets[first + 1]].strip():
+                first += 1
+            while last > first and not text[offsets[last - 1]:offsets[last]].strip():
+                last -= 1
+            
+            if first < last:
+                token_ids = tokens[first:last] if self.produces_model_tokens else None
+                chunks.append((text[offsets[first]:offsets[last]].strip(), last - first, token_ids))
+            if end >= token_count:
+                break
+            
+            next_start = max(end - overlap, start + 1)
+            if next_start < end:
+                next_start = self._find_overlap_start(text, offsets, next_start, end)
+            start = next_start
+        
+        return chunks
+    
+    def _find_cut(self, text: str, offsets: List[int], start: int, end: int) -> int:
+        """Find the token index closest to end, in the chunk's second half, that starts at a separator."""
+        min_end = start + max((end - start) // 2, 1)
+        lo_char, hi_char = offsets[min_end], offsets[end]
+        
+        for separator in self.separators:
+            if not separator:
+                break
+            pos = text.rfind(separator, lo_char, hi_char)
+            while pos >= lo_char:
+                token_index = bisect_left(offsets, pos, min_end, end + 1)
+                if token_index <= end and offsets[token_index] <= pos + len(separator):
+                    return token_index
+                pos = text.rfind(separator, lo_char, pos)
+        
+        return end
+    
+    def _find_overlap_start(self, text: str, offsets: List[int], start: int, end: int) -> int:
+        """Move an overlap start forward to the first separator boundary before end."""
+        lo_char, hi_char = offsets[start], offsets[end]
+        
+        for separator in self.separators:
+            if not separator:
+                break
+            pos = text.find(separator, lo_char, hi_char)
+            if pos != -1:
+                token_index = bisect_left(offsets, pos, start, end)
+                if token_index < end:
+                    return token_index
+        
+        return start
+    
     def chunk_document(self, document: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Chunk a document into smaller pieces with metadata."""
         content = document.get("content", "")
@@ -58,10 +210,10 @@ class TextChunker:
         
         try:
             # Split text into chunks
-            text_chunks = self.text_splitter.split_text(content)
+            text_chunks = self._split_text(content)
             
             chunks = []
-            for i, chunk_text in enumerate(text_chunks):
+            for i, (chunk_text, token_count, token_ids) in enumerate(text_chunks):
                 if not chunk_text.strip():
                     continue
                 
@@ -70,16 +222,21 @@ class TextChunker:
                     **metadata,  # Inherit document metadata
                     "chunk_index": i,
                     "chunk_id": chunk_id,
-                    "chunk_size": self._token_length(chunk_text),
+                    "chunk_size": token_count,
                     "content_preview": chunk_text[:200] + "..." if len(chunk_text) > 200 else chunk_text,
                     "total_chunks": len(text_chunks)
                 }
                 
-                chunks.append({
+                chunk = {
                     "chunk_id": chunk_id,
                     "content": chunk_text,
                     "metadata": chunk_metadata
-                })
+                }
+                if token_ids is not None:
+                    chunk_metadata["tokenizer"] = self.tokenizer.model_name
+                    chunk["token_ids"] = list(token_ids)
+                
+                chunks.append(chunk)
             
             logger.info(f"Created {len(chunks)} chunks for {metadata.get('source', 'unknown')}")
             return chunks
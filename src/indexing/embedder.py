@@ -1,11 +1,13 @@
 """Embedding utilities for OptimAIze using nomic-embed-text-v1."""
 
 import numpy as np
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Union, Optional
 from sentence_transformers import SentenceTransformer
 import torch
 from src.config.settings import config
 from src.utils.logger import logger
+from src.indexing.embedding_cache import get_embedding_cache
+from src.indexing.model_registry import model_registry
 
 class TextEmbedder:
     """Text embedding using nomic-embed-text-v1 model."""
@@ -14,40 +16,144 @@ class TextEmbedder:
         self.model_name = config.embeddings.get("model_name", "nomic-ai/nomic-embed-text-v1")
         self.dimension = config.embeddings.get("dimension", 768)
         self.device = config.embeddings.get("device", "cpu")
+        self.batch_size = config.embeddings.get("batch_size", 32)
+        self.batching = config.embeddings.get("batching", "token_budget")  # token_budget, fixed
+        self.max_batch_tokens = config.embeddings.get("max_batch_tokens", 16384)
+        self.max_batch_size = config.embeddings.get("max_batch_size", 128)
+        self.backend = config.embeddings.get("backend", "torch")  # torch, onnx
+        self.onnx_config = config.embeddings.get("onnx", {}) or {}
+        self.pool = None  # EmbeddingPool attached for bulk indexing
         
-        # Initialize the model
-        self.model = self._load_model()
+        # Check if CUDA is available and requested
+        if self.device == "cuda" and not torch.cuda.is_available():
+            logger.warning("CUDA requested but not available, falling back to CPU")
+            self.device = "cpu"
+        
+        # The model and cache are shared per process and loaded on first use
+        self._model = None
+        self._tokenizer = None
+        self._cache = None
         logger.info(f"Embedder initialized with {self.model_name} on {self.device}")
     
-    def _load_model(self) -> SentenceTransformer:
-        """Load the sentence transformer model."""
+    @property
+    def model(self):
+        """The shared embedding model, loaded through the registry on first use."""
+        if self._model is None:
+            model = model_registry.get_model(self.model_name, self.device, self.backend, self._load_model)
+            
+            # The onnx backend falls back to torch when it can't load
+            self.backend = getattr(model, "backend", "torch")
+            
+            actual_dim = model.get_sentence_embedding_dimension()
+            if actual_dim and actual_dim != self.dimension:
+                logger.warning(f"Model dimension {actual_dim} differs from config {self.dimension}, updating config")
+                self.dimension = actual_dim
+            
+            self._model = model
+        return self._model
+    
+    @property
+    def cache(self):
+        """The embedding cache, keyed on the model's resolved dimension and backend."""
+        if self._cache is None:
+            if self.pool is not None and self._model is None:
+                # The pool workers hold the model, so take the resolved settings from them
+                self.backend, self.dimension = self.pool.describe()
+            else:
+                # Loading the model settles the backend and dimension first
+                _ = self.model
+            self._cache = get_embedding_cache(self._cache_model_key(), self.dimension)
+        return self._cache
+    
+    def _load_model(self):
+        """Load the embedding model for the configured backend."""
         try:
-            # Check if CUDA is available and requested
-            if self.device == "cuda" and not torch.cuda.is_available():
-                logger.warning("CUDA requested but not available, falling back to CPU")
-                self.device = "cpu"
+            if self.backend == "onnx":
+                model = self._load_onnx_model()
+                if model is not None:
+                    return model
             
             # Load model with trust_remote_code=True for nomic models
-            model = SentenceTransformer(
+            return SentenceTransformer(
                 self.model_name, 
                 device=self.device,
                 trust_remote_code=True
             )
-            
-            # Verify model dimension
-            test_embedding = model.encode(["test"])
-            actual_dim = test_embedding.shape[1]
-            
-            if actual_dim != self.dimension:
-                logger.warning(f"Model dimension {actual_dim} differs from config {self.dimension}, updating config")
-                self.dimension = actual_dim
-            
-            return model
         
         except Exception as e:
             logger.error(f"Error loading embedding model {self.model_name}: {e}")
             raise
     
+    def _load_onnx_model(self):
+        """Load the ONNX Runtime model, exporting it first if needed. Returns None if unavailable."""
+        try:
+            from src.indexing.onnx_backend import (
+                OnnxEmbeddingModel, export_onnx_model, onnx_model_dir, check_export_parity
+            )
+        except ImportError as e:
+            logger.warning(f"ONNX backend unavailable ({e}), falling back to torch")
+            return None
+        
+        quantize = self.onnx_config.get("quantize", True)
+        min_parity_cosine = self.onnx_config.get("min_parity_cosine", 0.99)
+        model_dir = onnx_model_dir(self.onnx_config.get("model_dir", "data/models/onnx"), self.model_name)
+        model_file = model_dir / ("model_int8.onnx" if quantize else "model.onnx")
+        
+        try:
+            if not model_file.exists():
+                export_onnx_model(self.model_name, model_dir, quantize=quantize,
+                                  min_parity_cosine=min_parity_cosine)
+            
+            model = OnnxEmbeddingModel(
+                model_dir,
+                quantized=quantize,
+                intra_op_threads=self.onnx_config.get("intra_op_threads")
+            )
+            # Never index with an export that disagrees with the torch model
+            check_export_parity(model.export_config, min_parity_cosine)
+            logger.info(f"Loaded ONNX embedding model from {model_file}")
+            return model
+        
+        except Exception as e:
+            logger.error(f"Error loading ONNX model for {self.model_name}, falling back to torch: {e}")
+            return None
+    
+    def _cache_model_key(self) -> str:
+        """Identify the model variant whose vectors go in the cache."""
+        if self.backend == "onnx":
+            suffix = "int8" if self.onnx_config.get("quantize", True) else "fp32"
+            return f"{self.model_name}@onnx-{suffix}"
+        return self.model_name
+    
+    def check_backend_parity(self, texts: List[str]) -> Dict[str, Any]:
+        """Compare this embedder's vectors against the torch SentenceTransformer model."""
+        from src.indexing.onnx_backend import check_parity
+        
+        torch_model = SentenceTransformer(self.model_name, device="cpu", trust_remote_code=True)
+        return check_parity(self.model, torch_model, texts)
+    
+    @property
+    def tokenizer(self):
+        """The model's Hugging Face tokenizer, loaded on its own if the model isn't loaded."""
+        if self._model is not None:
+            return self._model.tokenizer
+        if self._tokenizer is None:
+            self._tokenizer = self._load_tokenizer()
+        return self._tokenizer
+    
+    def _load_tokenizer(self):
+        """Load only the tokenizer, so chunking doesn't require the model weights."""
+        from transformers import AutoTokenizer
+        
+        if self.backend == "onnx":
+            from src.indexing.onnx_backend import onnx_model_dir
+            
+            model_dir = onnx_model_dir(self.onnx_config.get("model_dir", "data/models/onnx"), self.model_name)
+            if (model_dir / "tokenizer_config.json").exists():
+                return AutoTokenizer.from_pretrained(str(model_dir))
+        
+        return AutoTokenizer.from_pretrained(self.model_name, trust_remote_code=True)
+    
     def embed_text(self, text: str) -> np.ndarray:
         """Embed a single text string."""
         try:
@@ -62,48 +168,186 @@ class TextEmbedder:
             logger.error(f"Error embedding text: {e}")
             return np.zeros(self.dimension, dtype=np.float32)
     
-    def embed_batch(self, texts: List[str], batch_size: int = 32) -> List[np.ndarray]:
-        """Embed a batch of texts efficiently."""
+    def embed_batch(self, texts: List[str], batch_size: int = None,
+                    token_ids: Optional[List[Optional[List[int]]]] = None,
+                    use_cache: bool = True) -> List[np.ndarray]:
+        """Embed a batch of texts efficiently.
+        
+        token_ids optionally holds pre-computed IDs from the model's own
+        tokenizer (without special tokens) for each text; texts that have
+        them skip tokenization. Results are returned in input order.
+        """
         if not texts:
             return []
         
+        # Rows are views into one matrix, not copies
+        return list(self.embed_matrix(texts, batch_size, token_ids, use_cache))
+    
+    def embed_matrix(self, texts: List[str], batch_size: int = None,
+                     token_ids: Optional[List[Optional[List[int]]]] = None,
+                     use_cache: bool = True) -> np.ndarray:
+        """Embed texts into one contiguous (len(texts), dimension) float32 matrix.
+        
+        Row i holds the embedding of texts[i]; empty texts get zero rows.
+        """
+        batch_size = batch_size or self.batch_size
+        
         try:
             # Filter out empty texts but keep track of indices
             non_empty_texts = []
+            non_empty_token_ids = []
             text_indices = []
             
             for i, text in enumerate(texts):
                 if text.strip():
                     non_empty_texts.append(text)
+                    non_empty_token_ids.append(token_ids[i] if token_ids else None)
                     text_indices.append(i)
             
             if not non_empty_texts:
-                logger.warning("All texts in batch are empty")
-                return [np.zeros(self.dimension, dtype=np.float32) for _ in texts]
+                if texts:
+                    logger.warning("All texts in batch are empty")
+                return np.zeros((len(texts), self.dimension), dtype=np.float32)
             
-            # Embed non-empty texts in batches
-            embeddings = []
-            for i in range(0, len(non_empty_texts), batch_size):
-                batch = non_empty_texts[i:i + batch_size]
-                batch_embeddings = self.model.encode(
-                    batch, 
-                    normalize_embeddings=True,
-                    batch_size=len(batch),
-                    show_progress_bar=len(non_empty_texts) > 100
-                )
-                embeddings.extend(batch_embeddings)
+            # Reuse cached vectors and only run the model on misses
+            if use_cache:
+                embeddings = self.cache.get_many(non_empty_texts)
+            else:
+                embeddings = [None] * len(non_empty_texts)
+            misses = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            
+            result = np.zeros((len(texts), self.dimension), dtype=np.float32)
+            hits = [i for i, embedding in enumerate(embeddings) if embedding is not None]
+            if hits:
+                result[[text_indices[i] for i in hits]] = np.asarray([embeddings[i] for i in hits])
             
-            # Create result array with proper indexing
-            result = [np.zeros(self.dimension, dtype=np.float32) for _ in texts]
-            for embedding, original_idx in zip(embeddings, text_indices):
-                result[original_idx] = embedding.astype(np.float32)
+            if misses:
+                miss_texts = [non_empty_texts[i] for i in misses]
+                miss_rows = [text_indices[i] for i in misses]
+                result[miss_rows] = np.asarray(self._encode(
+                    miss_texts,
+                    [non_empty_token_ids[i] for i in misses],
+                    batch_size
+                ), dtype=np.float32)
+                if use_cache:
+                    self.cache.put_many(miss_texts, result[miss_rows])
             
             logger.info(f"Successfully embedded {len(non_empty_texts)}/{len(texts)} texts")
             return result
         
         except Exception as e:
             logger.error(f"Error embedding batch of {len(texts)} texts: {e}")
-            return [np.zeros(self.dimension, dtype=np.float32) for _ in texts]
+            return np.zeros((len(texts), self.dimension), dtype=np.float32)
+    
+    def _encode(self, texts: List[str], token_ids: List[Optional[List[int]]],
+                batch_size: int = 32) -> List[np.ndarray]:
+        """Run the model on texts, using pre-computed token IDs where available."""
+        if self.pool is not None:
+            try:
+                return self.pool.encode(texts, token_ids, batch_size)
+            except Exception as e:
+                logger.error(f"Embedding pool failed on {len(texts)} texts, encoding locally: {e}")
+        
+        if self.batching == "fixed":
+            return self._encode_fixed(texts, token_ids, batch_size)
+        
+        # Tokenize the remaining texts in one fast-tokenizer call so every
+        # text has a known length for token-budget batching
+        raw = [i for i, ids in enumerate(token_ids) if not ids]
+        if raw:
+            token_ids = list(token_ids)
+            raw_ids = self.tokenizer(
+                [texts[i] for i in raw], add_special_tokens=False, verbose=False
+            )["input_ids"]
+            for i, ids in zip(raw, raw_ids):
+                token_ids[i] = ids
+        
+        return self._encode_token_ids(token_ids)
+    
+    def _encode_fixed(self, texts: List[str], token_ids: List[Optional[List[int]]],
+                      batch_size: int) -> List[np.ndarray]:
+        """Encode in arrival order with a fixed number of texts per batch."""
+        embeddings = [None] * len(texts)
+        
+        for start in range(0, len(texts), batch_size):
+            batch_indices = list(range(start, min(start + batch_size, len(texts))))
+            if all(token_ids[i] for i in batch_indices):
+                batch_embeddings = self._forward_token_ids([token_ids[i] for i in batch_indices])
+            else:
+                batch_embeddings = self.model.encode(
+                    [texts[i] for i in batch_indices], 
+                    normalize_embeddings=True,
+                    batch_size=len(batch_indices),
+                    show_progress_bar=False
+                )
+            for i, embedding in zip(batch_indices, batch_embeddings):
+                embeddings[i] = embedding
+        
+        return embeddings
+    
+    def _plan_batches(self, lengths: List[int]) -> List[List[int]]:
+        """Group indices into length-sorted batches within the padded token budget.
+        
+        Texts are sorted longest first, so each batch's padded size is its
+        first text's length times the batch size.
+        """
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+        batches = []
+        batch = []
+        
+        for i in order:
+            padded_length = lengths[batch[0]] if batch else lengths[i]
+            if batch and ((len(batch) + 1) * padded_length > self.max_batch_tokens
+                          or len(batch) >= self.max_batch_size):
+                batches.append(batch)
+                batch = []
+            batch.append(i)
+        
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _encode_token_ids(self, token_id_lists: List[List[int]]) -> List[np.ndarray]:
+        """Encode pre-tokenized inputs in length-bucketed, token-budgeted batches."""
+        max_tokens = self.model.max_seq_length - self.tokenizer.num_special_tokens_to_add()
+        lengths = [min(len(ids), max_tokens) for ids in token_id_lists]
+        
+        embeddings = [None] * len(token_id_lists)
+        for batch in self._plan_batches(lengths):
+            batch_embeddings = self._forward_token_ids([token_id_lists[i] for i in batch])
+            for i, embedding in zip(batch, batch_embeddings):
+                embeddings[i] = embedding
+        
+        return embeddings
+    
+    def _forward_token_ids(self, token_id_lists: List[List[int]]) -> np.ndarray:
+        """Run one model forward pass on a batch of pre-tokenized inputs."""
+        if self.backend == "onnx":
+            return self.model.encode_token_ids(token_id_lists)
+        
+        tokenizer = self.tokenizer
+        max_tokens = self.model.max_seq_length - tokenizer.num_special_tokens_to_add()
+        
+        batch = [
+            tokenizer.build_inputs_with_special_tokens(list(ids[:max_tokens]))
+            for ids in token_id_lists
+        ]
+        features = tokenizer.pad({"input_ids": batch}, padding=True, return_tensors="pt")
+        features = {key: value.to(self.model.device) for key, value in features.items()}
+        
+        with torch.no_grad():
+            output = self.model(features)
+        
+        embeddings = torch.nn.functional.normalize(output["sentence_embedding"], p=2, dim=1)
+        return embeddings.cpu().numpy()
+    
+    def _chunk_token_ids(self, chunks: List[Dict[str, Any]]) -> Optional[List[Optional[List[int]]]]:
+        """Get token IDs the chunker produced with this model's tokenizer, if any."""
+        token_ids = [
+            chunk.get("token_ids") if chunk.get("metadata", {}).get("tokenizer") == self.model_name else None
+            for chunk in chunks
+        ]
+        return token_ids if any(token_ids) else None
     
     def embed_chunks(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Embed chunks and add embeddings to their metadata."""
@@ -115,7 +359,7 @@ class TextEmbedder:
             texts = [chunk.get("content", "") for chunk in chunks]
             
             # Get embeddings
-            embeddings = self.embed_batch(texts)
+            embeddings = self.embed_batch(texts, token_ids=self._chunk_token_ids(chunks))
             
             # Add embeddings to chunks
             enriched_chunks = []
@@ -133,6 +377,23 @@ class TextEmbedder:
             logger.error(f"Error embedding chunks: {e}")
             return chunks
     
+    def embed_chunk_matrix(self, chunks: List[Dict[str, Any]]) -> np.ndarray:
+        """Embed chunks into one float32 matrix, tagging each chunk with its row.
+        
+        Chunks are updated in place with "embedding_row" instead of holding
+        their own embedding array.
+        """
+        texts = [chunk.get("content", "") for chunk in chunks]
+        embeddings = self.embed_matrix(texts, token_ids=self._chunk_token_ids(chunks))
+        
+        for row, chunk in enumerate(chunks):
+            chunk["embedding_row"] = row
+            chunk["metadata"]["embedding_model"] = self.model_name
+            chunk["metadata"]["embedding_dimension"] = self.dimension
+        
+        logger.info(f"Embedded {len(chunks)} chunks into a {embeddings.shape} matrix")
+        return embeddings
+    
     def compute_similarity(self, embedding1: np.ndarray, embedding2: np.ndarray) -> float:
         """Compute cosine similarity between two embeddings."""
         try:
@@ -156,8 +417,13 @@ class TextEmbedder:
             "model_name": self.model_name,
             "dimension": self.dimension,
             "device": self.device,
-            "max_sequence_length": getattr(self.model, 'max_seq_length', 'unknown'),
-            "normalization": True
+            "backend": self.backend,
+            "pool": self.pool.get_stats() if self.pool else None,
+            "loaded": self._model is not None,
+            "max_sequence_length": getattr(self._model, 'max_seq_length', 'unknown'),
+            "normalization": True,
+            "cache": self._cache.get_stats() if self._cache else None,
+            "model_registry": model_registry.get_stats()
         }
     
     def validate_embedding(self, embedding: np.ndarray) -> bool:
@@ -0,0 +1,229 @@
+"""Persistent embedding cache for OptimAIze."""
+
+import hashlib
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from src.config.settings import config
+from src.utils.logger import logger
+
+class EmbeddingCache:
+    """Disk-backed cache of float32 embeddings keyed by model, dimension and content hash.
+
+    Vectors live in a memory-mapped array file, one row per entry, and a
+    SQLite index maps normalized content hashes to rows. Each (model,
+    dimension) pair gets its own directory. Row allocation happens inside a
+    SQLite write transaction, so several processes can share a cache.
+    """
+
+    def __init__(self, model_name: str, dimension: int, cache_dir: Optional[str] = None):
+        cache_config = config.embeddings.get("cache", {}) or {}
+        self.enabled = cache_config.get("enabled", True)
+        self.model_name = model_name
+        self.dimension = dimension
+        self.growth_rows = cache_config.get("growth_rows", 4096)
+
+        namespace = re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{model_name}_{dimension}")
+        self.cache_dir = Path(cache_dir or cache_config.get("directory", "data/cache/embeddings")) / namespace
+        self.vectors_path = self.cache_dir / "vectors.f32"
+        self.index_path = self.cache_dir / "index.sqlite"
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = None
+        self._vectors = None
+        self._capacity = 0
+        self._count = 0
+
+        if self.enabled:
+            try:
+                self._open()
+            except Exception as e:
+                logger.error(f"Error opening embedding cache at {self.cache_dir}, disabling it: {e}")
+                self.enabled = False
+
+    def _open(self):
+        """Open the index and map the vector file."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._index = sqlite3.connect(str(self.index_path), check_same_thread=False,
+                                      isolation_level=None, timeout=30.0)
+        self._index.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (content_hash TEXT PRIMARY KEY, row INTEGER NOT NULL)"
+        )
+        self._count = self._next_row()
+        self._map_vectors(max(self._file_rows(), self._count))
+
+        logger.info(f"Embedding cache opened at {self.cache_dir} with {self._count} entries")
+
+    def _next_row(self) -> int:
+        """Get the next unallocated row from the index."""
+        return self._index.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM embeddings").fetchone()[0]
+
+    def _file_rows(self) -> int:
+        """Get the number of rows the vector file currently holds."""
+        if not self.vectors_path.exists():
+            return 0
+        return self.vectors_path.stat().st_size // (self.dimension * np.dtype(np.float32).itemsize)
+
+    def _map_vectors(self, capacity: int):
+        """(Re)map the vector file with room for capacity rows."""
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+
+        if capacity <= 0:
+            self._capacity = 0
+            return
+
+        size_bytes = capacity * self.dimension * np.dtype(np.float32).itemsize
+        with open(self.vectors_path, "ab") as f:
+            if f.tell() < size_bytes:
+                f.truncate(size_bytes)
+
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r+",
+                                  shape=(capacity, self.dimension))
+        self._capacity = capacity
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        """Hash text after normalizing whitespace."""
+        normalized = " ".join(text.split())
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def _lookup_rows(self, hashes: List[str]) -> Dict[str, int]:
+        """Find cache rows for a list of content hashes."""
+        rows = {}
+        unique_hashes = list(set(hashes))
+        for i in range(0, len(unique_hashes), 500):
+            batch = unique_hashes[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            for content_hash, row in self._index.execute(
+                f"SELECT content_hash, row FROM embeddings WHERE content_hash IN ({placeholders})", batch
+            ):
+                rows[content_hash] = row
+
+        # Another process may have grown the file since it was mapped
+        if rows and max(rows.values()) >= self._capacity:
+            self._map_vectors(self._file_rows())
+            rows = {content_hash: row for content_hash, row in rows.items() if row < self._capacity}
+        return rows
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Get cached embeddings for a batch of texts, None for misses."""
+        if not self.enabled or not texts:
+            return [None] * len(texts)
+
+        try:
+            hashes = [self.content_hash(text) for text in texts]
+            with self._lock:
+                rows = self._lookup_rows(hashes)
+                found = [i for i, content_hash in enumerate(hashes) if content_hash in rows]
+                vectors = self._vectors[[rows[hashes[i]] for i in found]] if found else None
+
+            results = [None] * len(texts)
+            for position, i in enumerate(found):
+                results[i] = vectors[position]
+
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+            return results
+
+        except Exception as e:
+            logger.error(f"Error reading embedding cache: {e}")
+            return [None] * len(texts)
+
+    def put_many(self, texts: List[str], embeddings: List[np.ndarray]) -> bool:
+        """Store embeddings for a batch of texts."""
+        if not self.enabled or not texts:
+            return True
+
+        try:
+            with self._lock:
+                hashes = [self.content_hash(text) for text in texts]
+                existing = self._lookup_rows(hashes)
+
+                new_entries = {}
+                for content_hash, embedding in zip(hashes, embeddings):
+                    if content_hash not in existing and content_hash not in new_entries:
+                        new_entries[content_hash] = embedding
+
+                if not new_entries:
+                    return True
+
+                # Hold the write lock while allocating rows and writing vectors
+                self._index.execute("BEGIN IMMEDIATE")
+                try:
+                    start_row = self._next_row()
+                    needed = start_row + len(new_entries)
+                    if needed > self._capacity:
+                        self._map_vectors(max(needed, self._file_rows(), self._capacity + self.growth_rows))
+
+                    # Write vectors before the index so the index never points at missing rows
+                    self._vectors[start_row:needed] = np.asarray(list(new_entries.values()), dtype=np.float32)
+                    self._vectors.flush()
+
+                    self._index.executemany(
+                        "INSERT OR IGNORE INTO embeddings (content_hash, row) VALUES (?, ?)",
+                        [(content_hash, start_row + i) for i, content_hash in enumerate(new_entries)]
+                    )
+                    self._index.execute("COMMIT")
+                except Exception:
+                    self._index.execute("ROLLBACK")
+                    raise
+
+                self._count = needed
+
+            return True
+
+        except Exception as e:
+            logger.error(f"Error writing embedding cache: {e}")
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit rate and size."""
+        lookups = self.hits + self.misses
+        size_bytes = 0
+        for path in (self.vectors_path, self.index_path):
+            if path.exists():
+                size_bytes += path.stat().st_size
+
+        return {
+            "enabled": self.enabled,
+            "model_name": self.model_name,
+            "dimension": self.dimension,
+            "entries": self._count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size_bytes": size_bytes
+        }
+
+    def close(self):
+        """Flush vectors and close the index."""
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._vectors = None
+            if self._index is not None:
+                self._index.close()
+                self._index = None
+            self.enabled = False
+
+# One cache per (model, dimension) in this process
+_caches: Dict[tuple, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+def get_embedding_cache(model_name: str, dimension: int) -> EmbeddingCache:
+    """Get the shared embedding cache for a model and dimension."""
+    key = (model_name, dimension)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = EmbeddingCache(model_name, dimension)
+        return _caches[key]
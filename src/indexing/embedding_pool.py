@@ -0,0 +1,140 @@
+"""Multi-process embedding pool for bulk indexing in OptimAIze."""
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from src.config.settings import config
+from src.utils.logger import logger
+
+# Per-process embedder, created once by the pool initializer
+_worker_embedder = None
+
+def _init_worker(embeddings_config: Dict[str, Any], threads: int):
+    """Pin the thread count and load the model in a worker process."""
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+    import torch
+    torch.set_num_threads(threads)
+
+    # Mirror the parent's embedding settings; the parent owns the cache
+    config.embeddings.clear()
+    config.embeddings.update(embeddings_config)
+    config.embeddings["pool"] = {"workers": 0}
+    config.embeddings["onnx"] = {**(embeddings_config.get("onnx") or {}), "intra_op_threads": threads}
+    config.embeddings["cache"] = {**(embeddings_config.get("cache") or {}), "enabled": False}
+
+    from src.indexing.embedder import TextEmbedder
+
+    global _worker_embedder
+    _worker_embedder = TextEmbedder()
+    _worker_embedder.model  # Load before the first shard arrives
+
+def _describe_worker() -> Tuple[str, int]:
+    """Report the backend and dimension the worker's model resolved to."""
+    return _worker_embedder.backend, _worker_embedder.dimension
+
+def _encode_in_worker(texts: List[str], token_ids: List[Optional[List[int]]], batch_size: int) -> np.ndarray:
+    """Encode one shard inside a worker process."""
+    embeddings = _worker_embedder._encode(texts, token_ids, batch_size)
+    return np.asarray(embeddings, dtype=np.float32)
+
+class EmbeddingPool:
+    """Shard embedding work across worker processes, each with its own model copy.
+
+    Workers are started with the spawn method so each one initializes torch
+    from scratch with a pinned thread count. Shards are submitted together
+    and gathered in submission order, so output order matches input order.
+    While a pool is attached the parent never loads the model itself.
+    """
+
+    def __init__(self, workers: int = None, threads_per_worker: int = None):
+        pool_config = config.embeddings.get("pool", {}) or {}
+        self.workers = workers or pool_config.get("workers", 0)
+        self.threads_per_worker = threads_per_worker or pool_config.get("threads_per_worker") or max(
+            1, (os.cpu_count() or 1) // max(self.workers, 1)
+        )
+        self.shard_size = pool_config.get("shard_size", 256)
+        self.min_shard_size = min(pool_config.get("min_shard_size", 32), self.shard_size)
+        # Chunks the pipeline gathers across files before each encode call
+        self.batch_chunks = pool_config.get("batch_chunks") or self.shard_size * max(self.workers, 1)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._model_info: Optional[Tuple[str, int]] = None
+
+        self.shards_run = 0
+        self.texts_embedded = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    def start(self):
+        """Start the worker processes."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(dict(config.embeddings), self.threads_per_worker)
+            )
+            logger.info(f"Embedding pool started with {self.workers} workers "
+                        f"({self.threads_per_worker} threads each)")
+
+    def shutdown(self):
+        """Stop the worker processes, cancelling queued shards."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            self._model_info = None
+            logger.info(f"Embedding pool stopped after {self.shards_run} shards, {self.texts_embedded} texts")
+
+    def describe(self) -> Tuple[str, int]:
+        """Get the (backend, dimension) of the workers' model, without loading it in this process."""
+        self.start()
+        if self._model_info is None:
+            self._model_info = self._executor.submit(_describe_worker).result()
+        return self._model_info
+
+    def encode(self, texts: List[str], token_ids: List[Optional[List[int]]],
+               batch_size: int = 32) -> List[np.ndarray]:
+        """Embed texts across the workers, returning vectors in input order."""
+        self.start()
+
+        # Enough shards to keep every worker busy, no larger than shard_size
+        # and no smaller than min_shard_size, so small inputs go as one shard
+        shard_size = max(self.min_shard_size, 1, min(self.shard_size, math.ceil(len(texts) / self.workers)))
+        futures = [
+            self._executor.submit(
+                _encode_in_worker,
+                texts[start:start + shard_size],
+                token_ids[start:start + shard_size],
+                batch_size
+            )
+            for start in range(0, len(texts), shard_size)
+        ]
+
+        embeddings = []
+        for future in futures:
+            embeddings.extend(future.result())
+
+        self.shards_run += len(futures)
+        self.texts_embedded += len(texts)
+        return embeddings
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool size and throughput counters."""
+        return {
+            "workers": self.workers,
+            "threads_per_worker": self.threads_per_worker,
+            "running": self._executor is not None,
+            "shards_run": self.shards_run,
+            "texts_embedded": self.texts_embedded
+        }
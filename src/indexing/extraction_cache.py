@@ -0,0 +1,151 @@
+"""Content-addressed cache of extracted document content for OptimAIze."""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from src.config.settings import config
+from src.utils.logger import logger
+
+class ExtractionCache:
+    """Compressed on-disk cache of FileLoader output with size-based LRU eviction."""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: Optional[float] = None):
+        cache_config = config.indexing.get("extraction_cache", {}) or {}
+        self.enabled = cache_config.get("enabled", True)
+        self.cache_dir = Path(cache_dir or cache_config.get("directory", "data/cache/extraction"))
+        self.max_size_bytes = int((max_size_mb or cache_config.get("max_size_mb", 2048)) * 1024 * 1024)
+
+        self.hits = 0
+        self.misses = 0
+        self._size_bytes = None  # Computed lazily on first write
+
+    def make_key(self, file_hash: str, loader_version: str, settings: Dict[str, Any]) -> str:
+        """Build a cache key from file content hash, loader version and extraction settings."""
+        key_source = json.dumps(
+            {"file_hash": file_hash, "loader_version": loader_version, "settings": settings},
+            sort_keys=True
+        )
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        """Get the file path of a cache entry."""
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached document, or None on a miss."""
+        path = self._entry_path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                document = json.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable extraction cache entry {path}: {e}")
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        # Touch the entry so eviction treats it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return document
+
+    def put(self, key: str, document: Dict[str, Any]) -> bool:
+        """Store a document in the cache."""
+        path = self._entry_path(key)
+        try:
+            data = gzip.compress(json.dumps(document, default=str).encode("utf-8"))
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Write atomically so concurrent loaders never read a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except Exception:
+                self._remove(Path(tmp_path))
+                raise
+
+            if self._size_bytes is None:
+                self._size_bytes = self._scan_size()
+            else:
+                self._size_bytes += len(data)
+
+            if self._size_bytes > self.max_size_bytes:
+                self._evict()
+
+            return True
+
+        except Exception as e:
+            logger.error(f"Error writing extraction cache entry {path}: {e}")
+            return False
+
+    def _scan_size(self) -> int:
+        """Compute the total size of cache entries on disk."""
+        total = 0
+        for path in self.cache_dir.glob("*/*.json.gz"):
+            try:
+                total += path.stat().st_size
+            except OSError:
+                continue
+        return total
+
+    def _evict(self):
+        """Evict least recently used entries until the cache is under 90% of its limit."""
+        entries = []
+        for path in self.cache_dir.glob("*/*.json.gz"):
+            try:
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        target = self.max_size_bytes * 0.9
+        evicted = 0
+
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            if self._remove(path):
+                total -= size
+                evicted += 1
+
+        self._size_bytes = total
+        logger.info(f"Evicted {evicted} extraction cache entries, {total / 1024 / 1024:.1f}MB remaining")
+
+    def _remove(self, path: Path) -> bool:
+        """Remove a cache file, ignoring entries already removed by another process."""
+        try:
+            path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.warning(f"Error removing extraction cache file {path}: {e}")
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit rate and size."""
+        lookups = self.hits + self.misses
+        if self._size_bytes is None:
+            self._size_bytes = self._scan_size()
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size_bytes": self._size_bytes,
+            "max_size_bytes": self.max_size_bytes
+        }
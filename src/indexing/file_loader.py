@@ -1,25 +1,77 @@
 """File loading utilities for OptimAIze."""
 
 import io
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
 import PyPDF2
 import pytesseract
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 from docx import Document
 from pptx import Presentation
 import openpyxl
 from PIL import Image
 from src.config.settings import config
 from src.utils.logger import logger
+from src.utils.file_utils import calculate_file_hash
+from src.indexing.extraction_cache import ExtractionCache
+
+# Bump whenever extraction output changes so cached documents are not reused
+LOADER_VERSION = "2"
 
 class FileLoader:
     """File loader for various document types."""
     
     def __init__(self):
+        self.enable_ocr = config.indexing.get("enable_ocr", True)
+        self.ocr_min_page_chars = config.indexing.get("ocr_min_page_chars", 50)
         self.ocr_dpi = config.indexing.get("ocr_dpi", 300)
+        self.ocr_workers = config.indexing.get("ocr_workers", 4)
+        self.ocr_page_window = config.indexing.get("ocr_page_window", 4)
+        self.ocr_max_inflight_pages = config.indexing.get("ocr_max_inflight_pages", 8)
+        self.extraction_cache = ExtractionCache()
     
-    def load_file(self, file_path: Path) -> Optional[Dict[str, Any]]:
+    def load_file(self, file_path: Path, file_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Load content from a file, reusing cached extraction output when available."""
+        if not self.extraction_cache.enabled:
+            return self._load_file_uncached(file_path)
+        
+        cache_key = None
+        try:
+            file_hash = file_hash or calculate_file_hash(file_path)
+            if file_hash:
+                cache_key = self.extraction_cache.make_key(
+                    file_hash, LOADER_VERSION, self._extraction_settings()
+                )
+                cached = self.extraction_cache.get(cache_key)
+                if cached:
+                    # Same content may live at another path
+                    cached["metadata"]["source"] = str(file_path)
+                    logger.debug(f"Extraction cache hit for {file_path}")
+                    return cached
+        except Exception as e:
+            logger.warning(f"Extraction cache lookup failed for {file_path}: {e}")
+        
+        document = self._load_file_uncached(file_path)
+        
+        # Pages whose OCR failed may succeed next time, so only complete extractions are cached
+        if (cache_key and document and document.get("content")
+                and not document["metadata"].get("ocr_failed_pages")):
+            self.extraction_cache.put(cache_key, document)
+        
+        return document
+    
+    def _extraction_settings(self) -> Dict[str, Any]:
+        """Settings that affect extraction output, used in the cache key."""
+        return {
+            "enable_ocr": self.enable_ocr,
+            "ocr_min_page_chars": self.ocr_min_page_chars,
+            "ocr_dpi": self.ocr_dpi,
+            "ocr_lang": "eng"
+        }
+    
+    def _load_file_uncached(self, file_path: Path) -> Optional[Dict[str, Any]]:
         """Load content from a file based on its extension."""
         try:
             extension = file_path.suffix.lower()
@@ -220,28 +272,55 @@ class FileLoader:
         return documents
     
     def _load_pdf(self, file_path: Path) -> Dict[str, Any]:
-        """Load PDF content with OCR fallback for image-based PDFs."""
+        """Load PDF content, using OCR only for pages without a usable text layer."""
         content = ""
         metadata = {"source": str(file_path), "type": "pdf", "pages": 0}
         
         try:
             # First try to extract text directly
+            page_texts = {}
             with open(file_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
                 metadata["pages"] = len(pdf_reader.pages)
                 
                 for page_num, page in enumerate(pdf_reader.pages):
-                    text = page.extract_text()
-                    if text.strip():
-                        content += f"\n--- Page {page_num + 1} ---\n{text}"
+                    try:
+                        page_texts[page_num + 1] = page.extract_text() or ""
+                    except Exception as e:
+                        logger.warning(f"Error extracting text from page {page_num + 1} of {file_path}: {e}")
+                        page_texts[page_num + 1] = ""
             
-            # If no text extracted or very little text, use OCR
-            if len(content.strip()) < 100:
-                logger.info(f"PDF {file_path} appears to be image-based, using OCR")
-                content = self._ocr_pdf(file_path)
-                metadata["ocr_used"] = True
-            else:
-                metadata["ocr_used"] = False
+            # OCR only the pages whose text layer is missing or too short
+            ocr_texts = {}
+            scanned_pages = [
+                page_number for page_number, text in page_texts.items()
+                if len(text.strip()) < self.ocr_min_page_chars
+            ]
+            if self.enable_ocr and scanned_pages:
+                logger.info(f"PDF {file_path}: using OCR for {len(scanned_pages)} of "
+                            f"{metadata['pages']} pages")
+                try:
+                    for page_number, text in self._iter_ocr_pages(file_path, scanned_pages):
+                        ocr_texts[page_number] = text
+                except Exception as e:
+                    logger.error(f"Error performing OCR on PDF {file_path}: {e}")
+                
+                # Failed pages come back as None, pages never reached are missing
+                metadata["ocr_failed_pages"] = [
+                    page_number for page_number in scanned_pages if ocr_texts.get(page_number) is None
+                ]
+            
+            ocr_pages = []
+            for page_number, text in page_texts.items():
+                ocr_text = ocr_texts.get(page_number) or ""
+                if len(ocr_text.strip()) > len(text.strip()):
+                    content += f"\n--- Page {page_number} (OCR) ---\n{ocr_text}"
+                    ocr_pages.append(page_number)
+                elif text.strip():
+                    content += f"\n--- Page {page_number} ---\n{text}"
+            
+            metadata["ocr_used"] = bool(ocr_pages)
+            metadata["ocr_pages"] = ocr_pages
             
             return {"content": content, "metadata": metadata}
         
@@ -249,24 +328,70 @@ class FileLoader:
             logger.error(f"Error loading PDF {file_path}: {e}")
             return {"content": "", "metadata": metadata}
     
-    def _ocr_pdf(self, file_path: Path) -> str:
-        """Extract text from PDF using OCR."""
-        try:
-            # Convert PDF to images
-            images = convert_from_path(file_path, dpi=self.ocr_dpi)
-            content = ""
-            
-            for i, image in enumerate(images):
-                # Extract text using OCR
-                text = pytesseract.image_to_string(image, lang='eng')
-                if text.strip():
-                    content += f"\n--- Page {i + 1} (OCR) ---\n{text}"
+    def _iter_ocr_pages(self, file_path: Path,
+                        page_numbers: Optional[Iterable[int]] = None) -> Iterator[Tuple[int, Optional[str]]]:
+        """OCR PDF pages in bounded windows, yielding (page_number, text) in page order.
+        
+        Pages are rasterized a window at a time with first_page/last_page and
+        recognized on a thread pool. At most ocr_max_inflight_pages rasterized
+        pages are held in memory at once.
+        """
+        if page_numbers is None:
+            page_count = pdfinfo_from_path(str(file_path))["Pages"]
+            page_numbers = range(1, page_count + 1)
+        
+        max_inflight = max(self.ocr_max_inflight_pages, 1)
+        window_size = max(min(self.ocr_page_window, max_inflight), 1)
+        pending = deque()
+        
+        with ThreadPoolExecutor(max_workers=max(self.ocr_workers, 1)) as executor:
+            for first_page, last_page in self._page_windows(page_numbers, window_size):
+                # Make room for the next window before rasterizing it
+                while pending and len(pending) + (last_page - first_page + 1) > max_inflight:
+                    yield self._collect_ocr_page(file_path, *pending.popleft())
+                
+                images = convert_from_path(
+                    file_path,
+                    dpi=self.ocr_dpi,
+                    first_page=first_page,
+                    last_page=last_page
+                )
+                for offset, image in enumerate(images):
+                    pending.append((first_page + offset, executor.submit(self._ocr_image, image)))
+                del images
             
-            return content
+            while pending:
+                yield self._collect_ocr_page(file_path, *pending.popleft())
+    
+    def _page_windows(self, page_numbers: Iterable[int], window_size: int) -> List[Tuple[int, int]]:
+        """Group page numbers into contiguous (first_page, last_page) windows."""
+        windows = []
+        for page_number in sorted(set(page_numbers)):
+            if windows:
+                first_page, last_page = windows[-1]
+                if page_number == last_page + 1 and last_page - first_page + 1 < window_size:
+                    windows[-1] = (first_page, page_number)
+                    continue
+            windows.append((page_number, page_number))
+        return windows
+    
+    def _ocr_image(self, image: Image.Image) -> str:
+        """Run OCR on a single rasterized page and release it."""
+        try:
+            return pytesseract.image_to_string(image, lang='eng')
+        finally:
+            image.close()
+    
+    def _collect_ocr_page(self, file_path: Path, page_number: int, future: Future) -> Tuple[int, Optional[str]]:
+        """Wait for a page's OCR result, isolating per-page failures.
         
+        A failed page yields None as its text.
+        """
+        try:
+            return page_number, future.result()
         except Exception as e:
-            logger.error(f"Error performing OCR on PDF {file_path}: {e}")
-            return ""
+            logger.error(f"Error performing OCR on page {page_number} of {file_path}: {e}")
+            return page_number, None
     
     def _load_docx(self, file_path: Path) -> Dict[str, Any]:
         """Load DOCX content."""
@@ -0,0 +1,23 @@
+"""Matryoshka embedding truncation and rescoring for OptimAIze."""
+
+from typing import List, Union
+
+import numpy as np
+
+def truncate_embeddings(embeddings: Union[np.ndarray, List[float]], dim: int) -> np.ndarray:
+    """Keep the first dim components of each embedding and renormalize to unit length.
+
+    Accepts a single vector or a 2D array of vectors and returns the same rank.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    truncated = embeddings[..., :dim]
+    norms = np.linalg.norm(truncated, axis=-1, keepdims=True)
+    return truncated / np.clip(norms, 1e-12, None)
+
+def rescore(query_embedding: Union[np.ndarray, List[float]], candidate_embeddings: np.ndarray) -> np.ndarray:
+    """Cosine similarity of a full-dimension query against full-dimension candidates."""
+    query = np.asarray(query_embedding, dtype=np.float32)
+    candidates = np.asarray(candidate_embeddings, dtype=np.float32)
+    query = query / max(np.linalg.norm(query), 1e-12)
+    norms = np.clip(np.linalg.norm(candidates, axis=1), 1e-12, None)
+    return candidates @ query / norms
@@ -0,0 +1,106 @@
+"""Process-wide registry of loaded embedding models for OptimAIze."""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.utils.logger import logger
+
+def _current_rss_bytes() -> Optional[int]:
+    """Get this process's resident set size, if the platform exposes it."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    try:
+        import resource
+        # Peak rather than current RSS here; kilobytes on Linux, bytes on macOS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if os.uname().sysname == "Darwin" else max_rss * 1024
+    except Exception:
+        return None
+
+def _model_weight_bytes(model: Any) -> Optional[int]:
+    """Estimate the memory held by a model's weights."""
+    if hasattr(model, "parameters"):
+        return sum(p.numel() * p.element_size() for p in model.parameters())
+
+    # ONNX models: the weights are the size of the graph file
+    model_path = getattr(model, "model_path", None)
+    if model_path and Path(model_path).exists():
+        return Path(model_path).stat().st_size
+    return None
+
+class ModelRegistry:
+    """Load each (model, device, backend) once, on first use, and share it.
+
+    Loads are serialized per key, so concurrent first callers wait for one
+    load instead of each loading their own copy.
+    """
+
+    def __init__(self):
+        self._models: Dict[Tuple[str, str, str], Any] = {}
+        self._stats: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self._key_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get_model(self, model_name: str, device: str, backend: str, loader: Callable[[], Any]) -> Any:
+        """Get the shared model for a key, calling loader() to load it the first time."""
+        key = (model_name, device, backend)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            model = self._models.get(key)
+            if model is not None:
+                return model
+
+            rss_before = _current_rss_bytes()
+            start_time = time.time()
+            model = loader()
+            load_seconds = time.time() - start_time
+            rss_after = _current_rss_bytes()
+
+            self._stats[key] = {
+                "model_name": model_name,
+                "device": device,
+                "backend": backend,
+                "load_seconds": load_seconds,
+                "weight_bytes": _model_weight_bytes(model),
+                "rss_delta_bytes": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+                "loaded_at": time.time()
+            }
+            self._models[key] = model
+
+        logger.info(f"Loaded {model_name} ({backend} on {device}) in {load_seconds:.1f}s")
+        return model
+
+    def is_loaded(self, model_name: str, device: str, backend: str) -> bool:
+        """Check whether a model has been loaded."""
+        return (model_name, device, backend) in self._models
+
+    def unload(self, model_name: str, device: str, backend: str) -> bool:
+        """Drop the registry's reference to a model."""
+        key = (model_name, device, backend)
+        with self._lock:
+            self._stats.pop(key, None)
+            return self._models.pop(key, None) is not None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get load time and memory usage of every loaded model."""
+        return {
+            "loaded_models": len(self._models),
+            "process_rss_bytes": _current_rss_bytes(),
+            "models": [dict(stats) for stats in self._stats.values()]
+        }
+
+# Global registry instance
+model_registry = ModelRegistry()
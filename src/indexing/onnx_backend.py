@@ -0,0 +1,213 @@
+"""ONNX Runtime embedding backend for OptimAIze."""
+
+import json
+import re
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from src.utils.logger import logger
+
+PARITY_SAMPLE_TEXTS = [
+    "What is the procedure for reporting a workplace injury?",
+    "The AED should be inspected monthly and after every use.",
+    "Quarterly revenue increased by 12 percent compared to the previous year.",
+    "Employees are eligible for benefits after 90 days of employment.",
+]
+
+def onnx_model_dir(base_dir: str, model_name: str) -> Path:
+    """Get the export directory for a model."""
+    return Path(base_dir) / re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+
+def export_onnx_model(model_name: str, output_dir: Path, quantize: bool = True,
+                      min_parity_cosine: Optional[float] = None) -> Path:
+    """Export a SentenceTransformer model to ONNX, optionally with dynamic int8 quantization.
+
+    The export is compared against the torch model and the result stored
+    with it. Raises ValueError if the lowest cosine is below min_parity_cosine.
+    Returns the path of the model file to load.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    st_model = SentenceTransformer(model_name, device="cpu", trust_remote_code=True)
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+
+    class _TransformerWrapper(torch.nn.Module):
+        """Expose only the token embeddings so the graph has one output."""
+
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask):
+            return self.model(input_ids=input_ids, attention_mask=attention_mask)[0]
+
+    dummy = tokenizer(["export sample text"], return_tensors="pt")
+    fp32_path = output_dir / "model.onnx"
+
+    logger.info(f"Exporting {model_name} to ONNX at {fp32_path}")
+    with torch.no_grad():
+        torch.onnx.export(
+            _TransformerWrapper(transformer),
+            (dummy["input_ids"], dummy["attention_mask"]),
+            str(fp32_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["token_embeddings"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "token_embeddings": {0: "batch", 1: "sequence"},
+            },
+            opset_version=17
+        )
+
+    model_path = fp32_path
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        model_path = output_dir / "model_int8.onnx"
+        logger.info(f"Quantizing {fp32_path} to int8 at {model_path}")
+        quantize_dynamic(str(fp32_path), str(model_path), weight_type=QuantType.QInt8)
+
+    tokenizer.save_pretrained(str(output_dir))
+    export_config = {
+        "model_name": model_name,
+        "pooling": st_model[1].get_pooling_mode_str(),
+        "max_seq_length": st_model.max_seq_length,
+        "dimension": st_model.get_sentence_embedding_dimension(),
+        "quantized": quantize
+    }
+    with open(output_dir / "embedding_config.json", "w", encoding="utf-8") as f:
+        json.dump(export_config, f, indent=2)
+
+    # Check the exported graph against the model it came from, and keep the
+    # result so later loads can refuse an export that failed it
+    onnx_model = OnnxEmbeddingModel(output_dir, quantized=quantize)
+    parity = check_parity(onnx_model, st_model, PARITY_SAMPLE_TEXTS)
+    export_config["parity"] = parity
+    with open(output_dir / "embedding_config.json", "w", encoding="utf-8") as f:
+        json.dump(export_config, f, indent=2)
+    logger.info(f"ONNX export parity vs torch: {parity}")
+
+    del st_model
+    check_export_parity(export_config, min_parity_cosine)
+    return model_path
+
+def check_export_parity(export_config: Dict[str, Any], min_parity_cosine: Optional[float]):
+    """Raise ValueError if an export's recorded parity is below min_parity_cosine."""
+    if min_parity_cosine is None:
+        return
+
+    parity = export_config.get("parity")
+    if parity is None:
+        logger.warning(f"ONNX export of {export_config.get('model_name')} has no recorded parity check")
+        return
+
+    if parity["min_cosine"] < min_parity_cosine:
+        raise ValueError(
+            f"ONNX export of {export_config.get('model_name')} has min cosine {parity['min_cosine']:.4f} "
+            f"vs torch, below onnx.min_parity_cosine {min_parity_cosine}"
+        )
+
+def check_parity(onnx_model, torch_model, texts: List[str]) -> Dict[str, Any]:
+    """Compare ONNX and torch embeddings by cosine similarity."""
+    onnx_embeddings = onnx_model.encode(texts, normalize_embeddings=True)
+    torch_embeddings = np.asarray(torch_model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+    cosines = np.sum(onnx_embeddings * torch_embeddings, axis=1)
+    return {
+        "texts": len(texts),
+        "min_cosine": float(cosines.min()),
+        "mean_cosine": float(cosines.mean())
+    }
+
+class OnnxEmbeddingModel:
+    """Sentence embedding model running on ONNX Runtime.
+
+    Mirrors the parts of the SentenceTransformer interface TextEmbedder uses:
+    encode(), tokenizer, max_seq_length and get_sentence_embedding_dimension().
+    """
+
+    backend = "onnx"
+
+    def __init__(self, model_dir: Path, quantized: bool = True, intra_op_threads: Optional[int] = None):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_dir = Path(model_dir)
+        with open(self.model_dir / "embedding_config.json", "r", encoding="utf-8") as f:
+            self.export_config = json.load(f)
+
+        self.pooling = self.export_config.get("pooling", "mean")
+        self.max_seq_length = self.export_config.get("max_seq_length", 512)
+        self.dimension = self.export_config.get("dimension")
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.model_dir))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+
+        self.model_path = self.model_dir / ("model_int8.onnx" if quantized else "model.onnx")
+        self.session = ort.InferenceSession(
+            str(self.model_path),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+
+    def get_sentence_embedding_dimension(self) -> Optional[int]:
+        """Get the embedding dimension."""
+        return self.dimension
+
+    def encode(self, texts: List[str], normalize_embeddings: bool = True,
+               batch_size: int = 32, **kwargs) -> np.ndarray:
+        """Embed texts, returning a (len(texts), dimension) float32 array."""
+        embeddings = []
+        for i in range(0, len(texts), batch_size):
+            features = self.tokenizer(
+                texts[i:i + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            embeddings.append(self._run(features["input_ids"], features["attention_mask"], normalize_embeddings))
+
+        if not embeddings:
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+        return np.vstack(embeddings)
+
+    def encode_token_ids(self, token_id_lists: List[List[int]], normalize_embeddings: bool = True) -> np.ndarray:
+        """Embed one batch of pre-tokenized inputs (without special tokens)."""
+        max_tokens = self.max_seq_length - self.tokenizer.num_special_tokens_to_add()
+        batch = [
+            self.tokenizer.build_inputs_with_special_tokens(list(ids[:max_tokens]))
+            for ids in token_id_lists
+        ]
+        features = self.tokenizer.pad({"input_ids": batch}, padding=True, return_tensors="np")
+        return self._run(features["input_ids"], features["attention_mask"], normalize_embeddings)
+
+    def _run(self, input_ids: np.ndarray, attention_mask: np.ndarray, normalize: bool) -> np.ndarray:
+        """Run the session and pool token embeddings into sentence embeddings."""
+        token_embeddings = self.session.run(
+            None,
+            {
+                "input_ids": input_ids.astype(np.int64),
+                "attention_mask": attention_mask.astype(np.int64)
+            }
+        )[0]
+
+        if self.pooling == "cls":
+            embeddings = token_embeddings[:, 0]
+        else:
+            mask = attention_mask[..., None].astype(np.float32)
+            embeddings = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        embeddings = embeddings.astype(np.float32)
+        if normalize:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+        return embeddings
@@ -0,0 +1,166 @@
+"""Process-pool document loading for the OptimAIze indexing pipeline."""
+
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple
+
+from src.config.settings import config
+from src.utils.logger import logger
+from src.indexing.file_loader import FileLoader
+
+# Per-process loader, created once by the pool initializer
+_worker_loader: Optional[FileLoader] = None
+
+def _init_worker():
+    """Create the FileLoader used by this worker process."""
+    global _worker_loader
+    _worker_loader = FileLoader()
+
+def _load_in_worker(file_path: str, file_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Load a single file inside a worker process."""
+    loader = _worker_loader or FileLoader()
+    return loader.load_file(Path(file_path), file_hash)
+
+class ParallelFileLoader:
+    """Load files in a process pool with a bounded number of in-flight files.
+
+    Workers are started through a forkserver (spawn where unavailable), so
+    they never fork from a parent that is running writer threads.
+    """
+
+    def __init__(self, max_workers: int = None, max_in_flight: int = None):
+        self.max_workers = max_workers or config.indexing.get("load_workers", 4)
+        self.max_in_flight = max_in_flight or config.indexing.get(
+            "max_in_flight_loads", self.max_workers * 2
+        )
+        self.max_in_flight = max(self.max_in_flight, self.max_workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    def start(self):
+        """Start the worker pool."""
+        if self._executor is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(method),
+                initializer=_init_worker
+            )
+            logger.info(f"Parallel file loader started with {self.max_workers} workers "
+                        f"(max {self.max_in_flight} files in flight)")
+
+    def _restart(self):
+        """Replace a worker pool broken by a dead worker process."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        logger.warning("Restarting parallel file loader after a worker process died")
+        self.start()
+
+    def shutdown(self):
+        """Stop the worker pool, cancelling queued work."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def iter_load(self, file_paths: Iterable[Path],
+                  file_hashes: Optional[Dict[Path, str]] = None) -> Iterator[Tuple[Path, Optional[Dict[str, Any]], Optional[str]]]:
+        """Yield (file_path, document, error) tuples as files finish loading.
+
+        Results are yielded in completion order. A failure in one file is
+        reported through the error element and never aborts the others.
+        When a worker process dies (a crash in a native parser, an OOM
+        kill) the pool is restarted and each file that was in flight is
+        rerun alone, so only the file that killed the worker fails.
+        file_paths is consumed lazily, and file_hashes is read when each
+        file is submitted, so both can be filled in as the stream advances.
+        """
+        self.start()
+        if file_hashes is None:
+            file_hashes = {}
+
+        pending = {}
+        submit_failures = []
+        suspects = []  # In flight when a worker died, rerun one at a time
+        remaining = iter(file_paths)
+
+        def submit(file_path: Path) -> Future:
+            try:
+                return self._executor.submit(_load_in_worker, str(file_path), file_hashes.get(file_path))
+            except BrokenProcessPool:
+                self._restart()
+                return self._executor.submit(_load_in_worker, str(file_path), file_hashes.get(file_path))
+
+        def submit_next() -> bool:
+            file_path = next(remaining, None)
+            if file_path is None:
+                return False
+            try:
+                pending[submit(file_path)] = file_path
+            except Exception as e:
+                logger.error(f"Error submitting {file_path} for loading: {e}")
+                submit_failures.append(file_path)  # Reported below
+            return True
+
+        def fill():
+            # Keep the pipeline full up to the in-flight limit
+            while len(pending) + len(submit_failures) < self.max_in_flight and submit_next():
+                pass
+
+        fill()
+
+        while pending or submit_failures or suspects:
+            if submit_failures:
+                yield submit_failures.pop(0), None, "Failed to submit file for loading"
+                fill()
+                continue
+
+            if suspects:
+                file_path = suspects.pop(0)
+                try:
+                    document = submit(file_path).result()
+                except BrokenProcessPool:
+                    logger.error(f"Worker process died loading {file_path}")
+                    self._restart()
+                    yield file_path, None, "Worker process died loading file"
+                except Exception as e:
+                    logger.error(f"Worker failed loading {file_path}: {e}")
+                    yield file_path, None, f"Worker failed loading file: {e}"
+                else:
+                    yield file_path, document, None
+
+                if not suspects:
+                    fill()
+                continue
+
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            pool_broken = False
+            for future in done:
+                file_path = pending.pop(future)
+                try:
+                    document = future.result()
+                except BrokenProcessPool:
+                    pool_broken = True
+                    suspects.append(file_path)
+                    continue
+                except Exception as e:
+                    logger.error(f"Worker failed loading {file_path}: {e}")
+                    yield file_path, None, f"Worker failed loading file: {e}"
+                    continue
+                yield file_path, document, None
+
+            if pool_broken:
+                # Everything still in flight died with the pool
+                suspects.extend(pending.values())
+                pending.clear()
+                self._restart()
+            else:
+                fill()
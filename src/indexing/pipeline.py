@@ -1,8 +1,9 @@
 """Main indexing pipeline for OptimAIze."""
 
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
+import numpy as np
 from tqdm import tqdm
 
 from src.config.settings import config
@@ -14,10 +15,14 @@ from src.utils.file_utils import (
 )
 from src.storage.metadata_db import metadata_db
 from src.storage.qdrant_client import qdrant_manager
+from src.storage.qdrant_writer import QdrantUpsertWriter
 from src.storage.elasticsearch_client import elasticsearch_manager
+from src.storage.elasticsearch_writer import ElasticsearchBulkWriter
 from src.indexing.file_loader import FileLoader
+from src.indexing.parallel_loader import ParallelFileLoader
 from src.indexing.chunker import TextChunker
 from src.indexing.embedder import TextEmbedder
+from src.indexing.embedding_pool import EmbeddingPool
 
 class IndexingPipeline:
     """Main indexing pipeline that coordinates file processing."""
@@ -27,11 +32,18 @@ class IndexingPipeline:
         self.input_directory = Path(self.config.get("input_directory", "data/documents"))
         self.supported_extensions = self.config.get("supported_extensions", [])
         self.batch_size = self.config.get("batch_size", 100)
+        self.parallel_loading = self.config.get("parallel_loading", False)
+        self.load_workers = self.config.get("load_workers", 4)
+        self.max_in_flight_loads = self.config.get("max_in_flight_loads", self.load_workers * 2)
+        self.embedding_workers = (config.embeddings.get("pool", {}) or {}).get("workers", 0)
+        self.parallel_loader: Optional[ParallelFileLoader] = None
+        self.qdrant_writer: Optional[QdrantUpsertWriter] = None
+        self.elasticsearch_writer: Optional[ElasticsearchBulkWriter] = None
         
         # Initialize components
         self.file_loader = FileLoader()
-        self.chunker = TextChunker()
         self.embedder = TextEmbedder()
+        self.chunker = TextChunker(embedder=self.embedder)
         
         logger.info("Indexing pipeline initialized")
     
@@ -60,13 +72,55 @@ class IndexingPipeline:
         processed_files = 0
         failed_files = []
         
-        for i in range(0, len(files_to_process), self.batch_size):
-            batch = files_to_process[i:i + self.batch_size]
-            batch_result = self._process_file_batch(batch)
+        # One loader pool for the whole run, started before any writer threads
+        if self.parallel_loading and len(files_to_process) > 1:
+            self.parallel_loader = ParallelFileLoader(
+                min(self.load_workers, len(files_to_process)), self.max_in_flight_loads
+            )
+            self.parallel_loader.start()
+        
+        # Shard embedding across worker processes for the length of the run
+        if self.embedding_workers > 0:
+            self.embedder.pool = EmbeddingPool(workers=self.embedding_workers)
+        
+        # Buffer Qdrant upserts and Elasticsearch bulk actions across files for the length of the run
+        self.qdrant_writer = QdrantUpsertWriter(qdrant_manager)
+        self.elasticsearch_writer = ElasticsearchBulkWriter(elasticsearch_manager)
+        qdrant_stats = None
+        elasticsearch_stats = None
+        
+        try:
+            if self.parallel_loader is not None:
+                batch_results = [self._process_files_parallel(files_to_process)]
+            else:
+                batch_results = (self._process_file_batch(batch) for batch in self._iter_batches(files_to_process))
+            
+            for batch_result in batch_results:
+                total_chunks += batch_result["chunks_created"]
+                processed_files += batch_result["files_processed"]
+                failed_files.extend(batch_result["failed_files"])
+        finally:
+            if self.parallel_loader is not None:
+                self.parallel_loader.shutdown()
+                self.parallel_loader = None
+            
+            if self.embedder.pool is not None:
+                self.embedder.pool.shutdown()
+                self.embedder.pool = None
             
-            total_chunks += batch_result["chunks_created"]
-            processed_files += batch_result["files_processed"]
-            failed_files.extend(batch_result["failed_files"])
+            qdrant_stats = self.qdrant_writer.close()
+            self.qdrant_writer = None
+            elasticsearch_stats = self.elasticsearch_writer.close()
+            self.elasticsearch_writer = None
+        
+        # Files whose chunks never reached storage are failed so the next run retries them
+        storage_failures = {source: "Qdrant upsert failed" for source in qdrant_stats["failed_sources"]}
+        for source in elasticsearch_stats["failed_sources"]:
+            storage_failures.setdefault(source, "Elasticsearch bulk indexing failed")
+        for source, error in storage_failures.items():
+            self._record_file_result(Path(source), self._file_metadata_for_result(Path(source)),
+                                     {"success": False, "error": error}, failed_files)
+            processed_files -= 1
         
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
@@ -77,12 +131,85 @@ class IndexingPipeline:
             "chunks_created": total_chunks,
             "failed_files": failed_files,
             "duration_seconds": duration,
-            "processing_rate": processed_files / duration if duration > 0 else 0
+            "processing_rate": processed_files / duration if duration > 0 else 0,
+            "qdrant_upserts": qdrant_stats,
+            "elasticsearch_bulk": elasticsearch_stats
         }
         
         logger.info(f"Pipeline completed: {result}")
         return result
     
+    def rebuild(self) -> Dict[str, Any]:
+        """Reindex everything into new Qdrant and Elasticsearch generations, then flip the aliases.
+        
+        Searches keep hitting the current generation until the new one is
+        complete. If nothing could be indexed, or more files failed than
+        indexing.rebuild allows, the new generation is dropped.
+        """
+        generation = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+        logger.info(f"Starting blue/green rebuild, generation {generation}")
+        
+        try:
+            qdrant_manager.begin_rebuild(generation)
+            elasticsearch_manager.begin_rebuild(generation)
+            result = self.run_full_pipeline(force_reprocess=True)
+        except Exception:
+            qdrant_manager.abort_rebuild()
+            elasticsearch_manager.abort_rebuild()
+            raise
+        
+        files_failed = len(result.get("failed_files", []))
+        max_failed = self._rebuild_failure_limit(result["files_processed"] + files_failed)
+        if result["files_processed"] == 0 or files_failed > max_failed:
+            logger.error(f"Rebuild indexed {result['files_processed']} files with {files_failed} failures "
+                         f"(at most {max_failed} allowed), keeping the current generation")
+            qdrant_manager.abort_rebuild()
+            elasticsearch_manager.abort_rebuild()
+            result["status"] = "aborted"
+            return result
+        
+        result["generation"] = generation
+        try:
+            result["qdrant_flip"] = qdrant_manager.finish_rebuild(collect=False)
+        except Exception:
+            qdrant_manager.abort_rebuild()
+            elasticsearch_manager.abort_rebuild()
+            raise
+        
+        # Both stores must serve the same generation: undo the Qdrant flip if Elasticsearch's fails
+        try:
+            result["elasticsearch_flip"] = elasticsearch_manager.finish_rebuild(collect=False)
+        except Exception as e:
+            logger.error(f"Elasticsearch flip failed after the Qdrant flip, rolling Qdrant back: {e}")
+            elasticsearch_manager.abort_rebuild()
+            try:
+                qdrant_manager.rollback_rebuild(result["qdrant_flip"])
+            except Exception as rollback_error:
+                raise RuntimeError(
+                    f"Qdrant serves generation {result['qdrant_flip']['collection']} but Elasticsearch still "
+                    f"serves the previous one, and rolling Qdrant back to {result['qdrant_flip']['previous']} "
+                    f"failed: {rollback_error}"
+                ) from e
+            result["status"] = "aborted"
+            result["error"] = f"Elasticsearch flip failed: {e}"
+            return result
+        
+        result["qdrant_flip"]["removed"] = qdrant_manager.collect_old_generations(
+            result["qdrant_flip"]["collection"]
+        )
+        result["elasticsearch_flip"]["removed"] = elasticsearch_manager.collect_old_generations(
+            result["elasticsearch_flip"]["index"]
+        )
+        logger.info(f"Rebuild {generation} is live")
+        return result
+    
+    def _rebuild_failure_limit(self, total_files: int) -> int:
+        """Get the number of failed files a rebuild may have and still go live."""
+        rebuild_config = self.config.get("rebuild", {}) or {}
+        max_failed_files = rebuild_config.get("max_failed_files", 0)
+        max_failed_ratio = rebuild_config.get("max_failed_ratio", 0.0) or 0.0
+        return max(max_failed_files, int(total_files * max_failed_ratio))
+    
     def _filter_files_for_processing(self, files: List[Path], force_reprocess: bool) -> List[Path]:
         """Filter files that need processing."""
         if force_reprocess:
@@ -111,13 +238,20 @@ class IndexingPipeline:
         
         return files_to_process
     
+    def _iter_batches(self, files: List[Path]) -> Iterator[List[Path]]:
+        """Yield files in batches, removing each batch's old chunks before it is processed."""
+        for i in range(0, len(files), self.batch_size):
+            batch = files[i:i + self.batch_size]
+            self._remove_batch_chunks(batch)
+            yield batch
+    
     def _process_file_batch(self, files: List[Path]) -> Dict[str, Any]:
         """Process a batch of files."""
         logger.info(f"Processing batch of {len(files)} files")
         
-        chunks_created = 0
-        files_processed = 0
-        failed_files = []
+        totals = {"files_processed": 0, "chunks_created": 0, "failed_files": []}
+        file_metadata_by_path = {}
+        pending_documents = []
         
         with tqdm(files, desc="Processing files") as pbar:
             for file_path in pbar:
@@ -125,60 +259,190 @@ class IndexingPipeline:
                     pbar.set_description(f"Processing {file_path.name}")
                     
                     # Update file status to processing
-                    file_metadata = get_file_metadata(file_path)
-                    if file_metadata:
-                        file_metadata["file_path"] = file_metadata.pop("path", str(file_path))  # Fix key name
-                        file_metadata["status"] = "processing"
-                        file_metadata["processed_time"] = datetime.utcnow()
-                        metadata_db.upsert_file_metadata(file_metadata)
+                    file_metadata = self._mark_file_processing(file_path)
+                    file_metadata_by_path[file_path] = file_metadata
+                    
+                    # Load the file, then chunk it and queue it for embedding
+                    file_hash = file_metadata.get("hash") if file_metadata else None
+                    try:
+                        document = self.file_loader.load_file(file_path, file_hash)
+                    except Exception as e:
+                        error_msg = f"Error processing file {file_path}: {e}"
+                        logger.error(error_msg)
+                        self._record_totals(file_path, file_metadata, {"success": False, "error": error_msg}, totals)
+                        continue
                     
-                    # Process single file
-                    result = self._process_single_file(file_path)
+                    self._queue_document(file_path, document, pending_documents, file_metadata_by_path, totals)
+                
+                except Exception as e:
+                    self._record_unexpected_error(file_path, e, totals)
+        
+        self._flush_documents(pending_documents, file_metadata_by_path, totals)
+        return totals
+    
+    def _process_files_parallel(self, files: List[Path]) -> Dict[str, Any]:
+        """Process files, loading them in the run's process pool.
+        
+        Parsing and OCR run in worker processes while chunking, embedding and
+        storage run on this process as each document finishes loading. Files
+        stream through the pool across batch boundaries; each batch's old
+        chunks are removed and its files marked processing as it is reached.
+        """
+        logger.info(f"Processing {len(files)} files with parallel loading")
+        
+        totals = {"files_processed": 0, "chunks_created": 0, "failed_files": []}
+        file_metadata_by_path = {}
+        file_hashes = {}
+        pending_documents = []
+        
+        def stream_files():
+            for batch in self._iter_batches(files):
+                for file_path in batch:
+                    try:
+                        file_metadata = self._mark_file_processing(file_path)
+                    except Exception as e:
+                        logger.error(f"Error updating status for {file_path}: {e}")
+                        file_metadata = None
+                    file_metadata_by_path[file_path] = file_metadata
+                    if file_metadata and file_metadata.get("hash"):
+                        file_hashes[file_path] = file_metadata["hash"]
+                    yield file_path
+        
+        with tqdm(total=len(files), desc="Processing files") as pbar:
+            for file_path, document, load_error in self.parallel_loader.iter_load(stream_files(), file_hashes):
+                try:
+                    pbar.set_description(f"Processing {file_path.name}")
                     
-                    if result["success"]:
-                        chunks_created += result["chunks_created"]
-                        files_processed += 1
-                        
-                        # Update file status to completed
-                        if file_metadata:
-                            file_metadata["file_path"] = file_metadata.get("file_path", str(file_path))
-                            file_metadata["status"] = "completed"
-                            file_metadata["chunk_count"] = result["chunks_created"]
-                            metadata_db.upsert_file_metadata(file_metadata)
+                    if load_error:
+                        self._record_totals(file_path, file_metadata_by_path.get(file_path),
+                                            {"success": False, "error": load_error}, totals)
                     else:
-                        failed_files.append({
-                            "file": str(file_path),
-                            "error": result.get("error", "Unknown error")
-                        })
-                        
-                        # Update file status to failed
-                        if file_metadata:
-                            file_metadata["file_path"] = file_metadata.get("file_path", str(file_path))
-                            file_metadata["status"] = "failed"
-                            file_metadata["error_message"] = result.get("error", "Unknown error")
-                            metadata_db.upsert_file_metadata(file_metadata)
+                        self._queue_document(file_path, document, pending_documents, file_metadata_by_path, totals)
                 
                 except Exception as e:
-                    error_msg = f"Unexpected error processing {file_path}: {e}"
-                    logger.error(error_msg)
-                    failed_files.append({
-                        "file": str(file_path),
-                        "error": error_msg
-                    })
-        
-        return {
-            "files_processed": files_processed,
-            "chunks_created": chunks_created,
-            "failed_files": failed_files
-        }
+                    self._record_unexpected_error(file_path, e, totals)
+                finally:
+                    pbar.update(1)
+        
+        self._flush_documents(pending_documents, file_metadata_by_path, totals)
+        return totals
+    
+    def _queue_document(self, file_path: Path, document: Optional[Dict[str, Any]],
+                        pending_documents: List[Tuple[Path, List[Dict[str, Any]]]],
+                        file_metadata_by_path: Dict[Path, Optional[Dict[str, Any]]], totals: Dict[str, Any]):
+        """Chunk a loaded document and queue it for embedding.
+        
+        With an embedding pool attached, documents are queued until they hold
+        the pool's batch_chunks chunks, so the pool gets work gathered across
+        files rather than one document at a time. Without a pool each
+        document is embedded as soon as it is queued.
+        """
+        prepared = self._chunk_document(file_path, document)
+        if not prepared["success"]:
+            self._record_totals(file_path, file_metadata_by_path.get(file_path), prepared, totals)
+            return
+        
+        pending_documents.append((file_path, prepared["chunks"]))
+        batch_chunks = self.embedder.pool.batch_chunks if self.embedder.pool is not None else 0
+        if sum(len(chunks) for _, chunks in pending_documents) >= batch_chunks:
+            self._flush_documents(pending_documents, file_metadata_by_path, totals)
+    
+    def _flush_documents(self, pending_documents: List[Tuple[Path, List[Dict[str, Any]]]],
+                         file_metadata_by_path: Dict[Path, Optional[Dict[str, Any]]], totals: Dict[str, Any]):
+        """Embed and store the queued documents, recording each file's result."""
+        if not pending_documents:
+            return
+        
+        results = self._index_chunked_documents(pending_documents)
+        for (file_path, _), result in zip(pending_documents, results):
+            try:
+                self._record_totals(file_path, file_metadata_by_path.get(file_path), result, totals)
+            except Exception as e:
+                self._record_unexpected_error(file_path, e, totals)
+        pending_documents.clear()
+    
+    def _record_totals(self, file_path: Path, file_metadata: Optional[Dict[str, Any]],
+                       result: Dict[str, Any], totals: Dict[str, Any]):
+        """Record a file's result and add it to the running totals."""
+        if self._record_file_result(file_path, file_metadata, result, totals["failed_files"]):
+            totals["chunks_created"] += result["chunks_created"]
+            totals["files_processed"] += 1
+    
+    def _record_unexpected_error(self, file_path: Path, error: Exception, totals: Dict[str, Any]):
+        """Add a file that failed outside the normal result path to the totals."""
+        error_msg = f"Unexpected error processing {file_path}: {error}"
+        logger.error(error_msg)
+        totals["failed_files"].append({
+            "file": str(file_path),
+            "error": error_msg
+        })
+    
+    def _mark_file_processing(self, file_path: Path) -> Optional[Dict[str, Any]]:
+        """Record that a file is being processed and return its metadata."""
+        file_metadata = get_file_metadata(file_path)
+        if file_metadata:
+            file_metadata["file_path"] = file_metadata.pop("path", str(file_path))  # Fix key name
+            file_metadata["status"] = "processing"
+            file_metadata["processed_time"] = datetime.utcnow()
+            metadata_db.upsert_file_metadata(file_metadata)
+        return file_metadata
+    
+    def _file_metadata_for_result(self, file_path: Path) -> Optional[Dict[str, Any]]:
+        """Get a file's current metadata in the shape _record_file_result expects."""
+        file_metadata = get_file_metadata(file_path)
+        if file_metadata:
+            file_metadata["file_path"] = file_metadata.pop("path", str(file_path))
+        return file_metadata
     
-    def _process_single_file(self, file_path: Path) -> Dict[str, Any]:
+    def _record_file_result(self, file_path: Path, file_metadata: Optional[Dict[str, Any]],
+                            result: Dict[str, Any], failed_files: List[Dict[str, Any]]) -> bool:
+        """Record the final status of a processed file. Returns True on success."""
+        if result["success"]:
+            # Update file status to completed
+            if file_metadata:
+                file_metadata["file_path"] = file_metadata.get("file_path", str(file_path))
+                file_metadata["status"] = "completed"
+                file_metadata["chunk_count"] = result["chunks_created"]
+                metadata_db.upsert_file_metadata(file_metadata)
+            return True
+        
+        failed_files.append({
+            "file": str(file_path),
+            "error": result.get("error", "Unknown error")
+        })
+        
+        # Update file status to failed
+        if file_metadata:
+            file_metadata["file_path"] = file_metadata.get("file_path", str(file_path))
+            file_metadata["status"] = "failed"
+            file_metadata["error_message"] = result.get("error", "Unknown error")
+            metadata_db.upsert_file_metadata(file_metadata)
+        return False
+    
+    def _process_single_file(self, file_path: Path, file_hash: Optional[str] = None) -> Dict[str, Any]:
         """Process a single file through the complete pipeline."""
         try:
             logger.debug(f"Processing file: {file_path}")
             
             # 1. Load file content
-            document = self.file_loader.load_file(file_path)
+            document = self.file_loader.load_file(file_path, file_hash)
+            return self._index_document(file_path, document)
+        
+        except Exception as e:
+            error_msg = f"Error processing file {file_path}: {e}"
+            logger.error(error_msg)
+            return {"success": False, "error": error_msg}
+    
+    def _index_document(self, file_path: Path, document: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Chunk, embed and store an already loaded document."""
+        prepared = self._chunk_document(file_path, document)
+        if not prepared["success"]:
+            return prepared
+        return self._index_chunked_documents([(file_path, prepared["chunks"])])[0]
+    
+    def _chunk_document(self, file_path: Path, document: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Chunk an already loaded document."""
+        try:
             if not document or not document.get("content"):
                 return {"success": False, "error": "Failed to load file content"}
             
@@ -186,43 +450,81 @@ class IndexingPipeline:
             chunks = self.chunker.chunk_document(document)
             if not chunks:
                 return {"success": False, "error": "No chunks created from document"}
-            
-            # 3. Generate embeddings
-            enriched_chunks = self.embedder.embed_chunks(chunks)
-            if not enriched_chunks:
-                return {"success": False, "error": "Failed to generate embeddings"}
-            
-            # 4. Store in vector database (Qdrant)
-            qdrant_success = qdrant_manager.add_chunks(enriched_chunks)
+            return {"success": True, "chunks": chunks}
+        
+        except Exception as e:
+            error_msg = f"Error processing file {file_path}: {e}"
+            logger.error(error_msg)
+            return {"success": False, "error": error_msg}
+    
+    def _index_chunked_documents(self, documents: List[Tuple[Path, List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """Embed the chunks of several documents in one call, then store each document.
+        
+        Returns one result per document, in order.
+        """
+        all_chunks = [chunk for _, chunks in documents for chunk in chunks]
+        try:
+            # 3. Generate embeddings as one matrix, chunks reference their rows
+            embeddings = self.embedder.embed_chunk_matrix(all_chunks)
+        except Exception as e:
+            error_msg = f"Error embedding {len(all_chunks)} chunks from {len(documents)} files: {e}"
+            logger.error(error_msg)
+            return [{"success": False, "error": error_msg} for _ in documents]
+        
+        results = []
+        start = 0
+        for file_path, chunks in documents:
+            # Each document gets its own slice of the matrix, rows renumbered from 0
+            for row, chunk in enumerate(chunks):
+                chunk["embedding_row"] = row
+            results.append(self._store_chunks(file_path, chunks, embeddings[start:start + len(chunks)]))
+            start += len(chunks)
+        return results
+    
+    def _store_chunks(self, file_path: Path, chunks: List[Dict[str, Any]], embeddings: np.ndarray) -> Dict[str, Any]:
+        """Store an embedded document's chunks in Qdrant, Elasticsearch and the metadata database."""
+        try:
+            # 4. Store in vector database (Qdrant), buffered during full pipeline runs
+            if self.qdrant_writer is not None:
+                qdrant_success = self.qdrant_writer.add(chunks, embeddings)
+            else:
+                qdrant_success = qdrant_manager.add_chunks(chunks, embeddings)
             if not qdrant_success:
                 logger.warning(f"Failed to store chunks in Qdrant for {file_path}")
             
-            # 5. Store in keyword search (Elasticsearch)
-            es_success = elasticsearch_manager.add_chunks(enriched_chunks)
+            # 5. Store in keyword search (Elasticsearch), buffered during full pipeline runs
+            if self.elasticsearch_writer is not None:
+                es_success = self.elasticsearch_writer.add(chunks)
+            else:
+                es_success = elasticsearch_manager.add_chunks(chunks)
             if not es_success:
                 logger.warning(f"Failed to store chunks in Elasticsearch for {file_path}")
             
-            # 6. Store chunk metadata in database
-            for chunk in enriched_chunks:
+            # 6. Store chunk metadata in database. Buffered chunks are only queued
+            # here; run_full_pipeline fails the file if its writer later reports
+            # the source in failed_sources.
+            qdrant_key = "qdrant_queued" if self.qdrant_writer is not None else "qdrant_stored"
+            es_key = "elasticsearch_queued" if self.elasticsearch_writer is not None else "elasticsearch_stored"
+            for chunk in chunks:
                 chunk_meta = {
                     "file_path": str(file_path),
                     "chunk_index": chunk["metadata"]["chunk_index"],
                     "chunk_id": chunk["chunk_id"],
                     "content_preview": chunk["metadata"]["content_preview"],
                     "chunk_size": chunk["metadata"]["chunk_size"],
-                    "qdrant_stored": qdrant_success,
-                    "elasticsearch_stored": es_success,
+                    qdrant_key: qdrant_success,
+                    es_key: es_success,
                     "created_time": datetime.utcnow()
                 }
                 metadata_db.add_chunk_metadata(chunk_meta)
             
-            logger.info(f"Successfully processed {file_path}: {len(enriched_chunks)} chunks created")
+            logger.info(f"Successfully processed {file_path}: {len(chunks)} chunks created")
             
             return {
                 "success": True,
-                "chunks_created": len(enriched_chunks),
-                "qdrant_stored": qdrant_success,
-                "elasticsearch_stored": es_success
+                "chunks_created": len(chunks),
+                qdrant_key: qdrant_success,
+                es_key: es_success
             }
         
         except Exception as e:
@@ -264,6 +566,36 @@ class IndexingPipeline:
         except Exception as e:
             logger.error(f"Error removing chunks for {file_path}: {e}")
     
+    def _remove_batch_chunks(self, files: List[Path]):
+        """Remove old chunks of a batch's previously indexed files with one delete per storage system.
+        
+        Deletes are queued without waiting or refreshing and never touch
+        the chunks the batch writes afterwards.
+        """
+        # A rebuild writes into an empty generation, so there is nothing to remove there
+        delete_qdrant = qdrant_manager.write_collection == qdrant_manager.collection_name
+        delete_elasticsearch = elasticsearch_manager.write_index == elasticsearch_manager.index_name
+        if not (delete_qdrant or delete_elasticsearch):
+            return
+        
+        sources = []
+        for file_path in files:
+            try:
+                if metadata_db.get_file_metadata(str(file_path)):
+                    sources.append(str(file_path))
+            except Exception as e:
+                logger.error(f"Error checking stored metadata for {file_path}: {e}")
+        
+        if not sources:
+            return
+        
+        if delete_qdrant:
+            qdrant_manager.delete_chunks_by_sources(sources)
+        if delete_elasticsearch:
+            elasticsearch_manager.delete_chunks_by_sources(sources)
+        
+        logger.info(f"Removed existing chunks for {len(sources)} files in batch")
+    
     def get_pipeline_status(self) -> Dict[str, Any]:
         """Get current pipeline status and statistics."""
         try:
@@ -287,7 +619,8 @@ class IndexingPipeline:
                     "elasticsearch": es_healthy,
                     "overall": qdrant_healthy and es_healthy
                 },
-                "embedder_info": self.embedder.get_model_info()
+                "embedder_info": self.embedder.get_model_info(),
+                "extraction_cache": self.file_loader.extraction_cache.get_stats()
             }
         
         except Exception as e:
@@ -14,6 +14,9 @@ from src.llm.models import (
 )
 from src.retrieval.models import SearchResult
 
+# Indexed keyword fields the context and citations read (file name and path come from source)
+CONTEXT_FIELDS = ["content", "source", "chunk_index"]
+
 class LLMProcessor:
     """Main processor for LLM-powered question answering."""
     
@@ -81,7 +84,9 @@ Please provide a helpful answer based solely on the context provided above. If y
                 query=query.query,
                 mode=query.mode,
                 top_k=query.top_k,
-                min_similarity=query.min_similarity
+                min_similarity=query.min_similarity,
+                fields=CONTEXT_FIELDS,
+                highlight=False
             )
             
             search_time_ms = (time.time() - search_start) * 1000
@@ -29,6 +29,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("shutdown")
+async def shutdown():
+    """Close search engine clients and worker threads."""
+    await search_engine.close()
+
 # Request/Response models
 class SearchRequest(BaseModel):
     query: str = Field(..., description="Search query")
@@ -254,11 +259,14 @@ async def get_system_stats():
     try:
         from src.indexing.pipeline import indexing_pipeline
         
+        # Status calls hit every backend synchronously, keep them off the event loop
+        loop = asyncio.get_running_loop()
+        
         # Get pipeline status
-        pipeline_status = indexing_pipeline.get_pipeline_status()
+        pipeline_status = await loop.run_in_executor(None, indexing_pipeline.get_pipeline_status)
         
         # Get search engine stats
-        search_stats = search_engine.get_search_stats()
+        search_stats = await loop.run_in_executor(None, search_engine.get_search_stats)
         
         return StatsResponse(
             documents={
@@ -0,0 +1,123 @@
+"""Micro-batching query embedding service for OptimAIze search."""
+
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from src.config.settings import config
+from src.utils.logger import logger
+from src.indexing.embedder import TextEmbedder
+
+class QueryEmbeddingService:
+    """Collect concurrent query embeddings into batches run off the event loop.
+
+    Queries queue up until either batch_window_ms has passed since the first
+    one arrived or max_batch_size queries are waiting. The batch is then
+    embedded with a single embed_batch call on a dedicated thread.
+    """
+
+    def __init__(self, embedder: TextEmbedder):
+        service_config = config.retrieval.get("query_embedding", {}) or {}
+        self.embedder = embedder
+        self.batch_window_ms = service_config.get("batch_window_ms", 5.0)
+        self.max_batch_size = service_config.get("max_batch_size", 32)
+
+        # One model thread: batches run back to back, never interleaved
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-embedding")
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Metrics
+        self.batches_run = 0
+        self.queries_embedded = 0
+        self.max_batch_seen = 0
+        self.last_batch_size = 0
+        self.total_batch_time_ms = 0.0
+
+    def _ensure_worker(self):
+        """Start the batching task on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed a query, batched with other concurrent queries."""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _run(self):
+        """Collect queued queries into batches and embed them."""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.batch_window_ms / 1000.0
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Embed one batch and resolve its futures."""
+        texts = [text for text, _ in batch]
+        start_time = time.time()
+
+        try:
+            # Queries bypass the persistent cache meant for indexed chunks
+            embeddings = await asyncio.get_running_loop().run_in_executor(
+                self._executor, functools.partial(self.embedder.embed_batch, texts, use_cache=False)
+            )
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+
+        except Exception as e:
+            logger.error(f"Error embedding query batch of {len(texts)}: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+        self.batches_run += 1
+        self.queries_embedded += len(batch)
+        self.last_batch_size = len(batch)
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+        self.total_batch_time_ms += (time.time() - start_time) * 1000
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get queue depth and batch size metrics."""
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "batches_run": self.batches_run,
+            "queries_embedded": self.queries_embedded,
+            "avg_batch_size": self.queries_embedded / self.batches_run if self.batches_run else 0.0,
+            "max_batch_size_seen": self.max_batch_seen,
+            "last_batch_size": self.last_batch_size,
+            "avg_batch_time_ms": self.total_batch_time_ms / self.batches_run if self.batches_run else 0.0,
+            "batch_window_ms": self.batch_window_ms,
+            "max_batch_size": self.max_batch_size
+        }
+
+    async def close(self):
+        """Stop the batching task and the model thread."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self._executor.shutdown(wait=False)
@@ -28,6 +28,7 @@ class SearchResult:
     highlights: Optional[List[str]] = None
     file_type: Optional[str] = None
     total_chunks: Optional[int] = None
+    match_phase: Optional[str] = None  # Keyword results: "exact" or "fuzzy"
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -59,6 +60,13 @@ class SearchQuery:
     min_similarity: float = 0.0
     filters: Optional[Dict[str, Any]] = None
     
+    # Keyword result projection: stored fields to return (None for all) and highlighting
+    fields: Optional[List[str]] = None
+    highlight: bool = True
+    
+    # Set by keyword search: the phase that answered ("exact" or "fuzzy")
+    keyword_phase: Optional[str] = None
+    
     def __post_init__(self):
         """Validate query parameters."""
         if self.mode not in ["hybrid", "semantic", "keyword"]:
@@ -87,6 +95,9 @@ class SearchResponse:
     fusion_method: Optional[str] = None
     fusion_params: Optional[Dict[str, Any]] = None
     
+    # Keyword phase the search finished in ("exact" or "fuzzy"), None if keyword search didn't run
+    keyword_phase: Optional[str] = None
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON API response."""
         return {
@@ -98,7 +109,8 @@ class SearchResponse:
                 "search_time_ms": self.search_time_ms,
                 "sources_searched": self.sources_searched,
                 "fusion_method": self.fusion_method,
-                "fusion_params": self.fusion_params
+                "fusion_params": self.fusion_params,
+                "keyword_phase": self.keyword_phase
             }
         }
     
@@ -2,7 +2,7 @@
 """Query preprocessing for OptimAIze retrieval."""
 
 import re
-from typing import Dict, Any
+from typing import List, Dict, Any, Optional
 from src.config.settings import config
 from src.utils.logger import logger
 from src.retrieval.models import SearchQuery
@@ -17,7 +17,8 @@ class QueryProcessor:
     
     def process_query(self, raw_query: str, mode: str = "hybrid", 
                      top_k: int = None, min_similarity: float = None,
-                     filters: Dict[str, Any] = None) -> SearchQuery:
+                     filters: Dict[str, Any] = None, fields: Optional[List[str]] = None,
+                     highlight: bool = True) -> SearchQuery:
         """Process and validate a search query."""
         try:
             # Basic validation
@@ -45,7 +46,9 @@ class QueryProcessor:
                 mode=mode,
                 top_k=top_k,
                 min_similarity=min_similarity,
-                filters=filters
+                filters=filters,
+                fields=fields,
+                highlight=highlight
             )
         
         except Exception as e:
@@ -1,7 +1,9 @@
 """Main search engine for OptimAIze hybrid retrieval."""
 
 import asyncio
+import functools
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
@@ -13,6 +15,7 @@ from src.indexing.embedder import TextEmbedder
 from src.retrieval.models import SearchResult, SearchQuery, SearchResponse
 from src.retrieval.query_processor import QueryProcessor
 from src.retrieval.fusion import ResultFusion
+from src.retrieval.embedding_service import QueryEmbeddingService
 
 class SearchEngine:
     """Main search engine that coordinates hybrid retrieval."""
@@ -20,6 +23,7 @@ class SearchEngine:
     def __init__(self):
         self.retrieval_config = config.retrieval
         self.embedder = TextEmbedder()
+        self.query_embedder = QueryEmbeddingService(self.embedder)
         self.query_processor = QueryProcessor()
         self.fusion_engine = ResultFusion()
         
@@ -28,18 +32,33 @@ class SearchEngine:
         self.concurrent_search = self.retrieval_config.get("concurrent_search", True)
         self.search_timeout = self.retrieval_config.get("search_timeout", 30.0)
         
+        # Bounded pool per backend so blocking client calls never run on the
+        # event loop and one slow backend cannot starve the other
+        self._qdrant_executor = ThreadPoolExecutor(
+            max_workers=self.retrieval_config.get("qdrant_workers", 8),
+            thread_name_prefix="qdrant-search"
+        )
+        self._elasticsearch_executor = ThreadPoolExecutor(
+            max_workers=self.retrieval_config.get("elasticsearch_workers", 8),
+            thread_name_prefix="elasticsearch-search"
+        )
+        
         logger.info("Search engine initialized")
     
     async def search(self, query: str, mode: str = "hybrid", 
                     top_k: int = None, min_similarity: float = None,
-                    filters: Dict[str, Any] = None) -> SearchResponse:
-        """Perform search with specified mode."""
+                    filters: Dict[str, Any] = None, fields: Optional[List[str]] = None,
+                    highlight: bool = True) -> SearchResponse:
+        """Perform search with specified mode.
+        
+        fields and highlight trim keyword results to what the caller reads.
+        """
         start_time = time.time()
         
         try:
             # Process the query
             search_query = self.query_processor.process_query(
-                query, mode, top_k, min_similarity, filters
+                query, mode, top_k, min_similarity, filters, fields, highlight
             )
             
             logger.info(f"Executing {search_query.mode} search for: '{search_query.processed_query}'")
@@ -66,7 +85,8 @@ class SearchEngine:
                 search_time_ms=search_time_ms,
                 sources_searched=sources,
                 fusion_method=fusion_info.get("method") if fusion_info else None,
-                fusion_params=fusion_info
+                fusion_params=fusion_info,
+                keyword_phase=search_query.keyword_phase
             )
             
             logger.info(f"Search completed: {len(results)} results in {search_time_ms:.1f}ms")
@@ -128,16 +148,22 @@ class SearchEngine:
     async def _get_semantic_results(self, search_query: SearchQuery) -> List[SearchResult]:
         """Get results from semantic search (Qdrant)."""
         try:
-            # Generate query embedding
-            query_embedding = self.embedder.embed_text(search_query.processed_query)
+            # Generate query embedding, batched with concurrent queries
+            query_embedding = await self.query_embedder.embed(search_query.processed_query)
             
-            # Search Qdrant
-            qdrant_results = qdrant_manager.search_similar(
-                query_embedding=query_embedding,
-                limit=self.top_k_per_source,
-                score_threshold=search_query.min_similarity,
-                filter_conditions=search_query.filters
-            )
+            # Search Qdrant, natively async or on the Qdrant executor
+            search_kwargs = {
+                "query_embedding": query_embedding,
+                "limit": self.top_k_per_source,
+                "score_threshold": search_query.min_similarity,
+                "filter_conditions": search_query.filters
+            }
+            if qdrant_manager.async_mode:
+                qdrant_results = await qdrant_manager.search_similar_async(**search_kwargs)
+            else:
+                qdrant_results = await self._run_blocking(
+                    self._qdrant_executor, qdrant_manager.search_similar, **search_kwargs
+                )
             
             # Convert to SearchResult objects
             results = []
@@ -159,12 +185,22 @@ class SearchEngine:
             # Build filters for Elasticsearch
             es_filters = self._build_elasticsearch_filters(search_query.filters)
             
-            # Search Elasticsearch
-            es_results = elasticsearch_manager.search_keywords(
-                query=search_query.processed_query,
-                limit=self.top_k_per_source,
-                filters=es_filters
-            )
+            # Search Elasticsearch, natively async or on the Elasticsearch executor
+            search_kwargs = {
+                "query": search_query.processed_query,
+                "limit": self.top_k_per_source,
+                "filters": es_filters,
+                "fields": search_query.fields,
+                "highlight": search_query.highlight
+            }
+            if elasticsearch_manager.async_mode:
+                es_results, search_query.keyword_phase = await elasticsearch_manager.search_keywords_phased_async(
+                    **search_kwargs
+                )
+            else:
+                es_results, search_query.keyword_phase = await self._run_blocking(
+                    self._elasticsearch_executor, elasticsearch_manager.search_keywords_phased, **search_kwargs
+                )
             
             # Convert to SearchResult objects
             results = []
@@ -173,13 +209,18 @@ class SearchEngine:
                 if search_result:
                     results.append(search_result)
             
-            logger.debug(f"Found {len(results)} keyword results")
+            logger.debug(f"Found {len(results)} keyword results ({search_query.keyword_phase} phase)")
             return results
         
         except Exception as e:
             logger.error(f"Keyword search failed: {e}")
             return []
     
+    async def _run_blocking(self, executor: ThreadPoolExecutor, func, *args, **kwargs):
+        """Run a blocking call on a backend executor without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+    
     def _convert_qdrant_result(self, qdrant_result: Dict[str, Any]) -> Optional[SearchResult]:
         """Convert Qdrant result to SearchResult object."""
         try:
@@ -220,7 +261,8 @@ class SearchEngine:
                 page_number=metadata.get("page_number"),
                 highlights=highlights if highlights else None,
                 file_type=metadata.get("type"),
-                total_chunks=metadata.get("total_chunks")
+                total_chunks=metadata.get("total_chunks"),
+                match_phase=es_result.get("match_phase")
             )
         except Exception as e:
             logger.error(f"Error converting Elasticsearch result: {e}")
@@ -269,7 +311,9 @@ class SearchEngine:
                     "concurrent_search": self.concurrent_search,
                     "fusion_method": self.fusion_engine.fusion_method,
                     "embedding_model": self.embedder.model_name
-                }
+                },
+                "query_embedding": self.query_embedder.get_metrics(),
+                "keyword_phases": dict(elasticsearch_manager.keyword_phase_counts)
             }
         except Exception as e:
             logger.error(f"Error getting search stats: {e}")
@@ -286,10 +330,12 @@ class SearchEngine:
             
             search_time = (time.time() - start_time) * 1000
             
+            search_stats = await asyncio.get_running_loop().run_in_executor(None, self.get_search_stats)
+            
             return {
                 "status": "healthy" if response.total_found >= 0 else "unhealthy",
                 "test_search_time_ms": search_time,
-                "components": self.get_search_stats()["health"],
+                "components": search_stats["health"],
                 "timestamp": time.time()
             }
         except Exception as e:
@@ -300,5 +346,13 @@ class SearchEngine:
                 "timestamp": time.time()
             }
 
+    async def close(self):
+        """Release the query embedder, async clients and backend executors."""
+        await self.query_embedder.close()
+        await qdrant_manager.close_async()
+        await elasticsearch_manager.close_async()
+        self._qdrant_executor.shutdown(wait=False)
+        self._elasticsearch_executor.shutdown(wait=False)
+
 # Global search engine instance
 search_engine = SearchEngine()
\ No newline at end of file
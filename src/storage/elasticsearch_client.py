@@ -1,18 +1,43 @@
 """Elasticsearch client for keyword search in OptimAIze."""
 
-from typing import List, Dict, Any, Optional
-from elasticsearch import Elasticsearch
+import asyncio
+from typing import List, Dict, Any, Optional, Tuple
+from elasticsearch import Elasticsearch, AsyncElasticsearch
 from elasticsearch.exceptions import ConnectionError, NotFoundError
 from src.config.settings import config
 from src.utils.logger import logger
 
+# Stored fields keyword results never read, left out of _source by default
+KEYWORD_SOURCE_EXCLUDES = ["chunk_id", "content_preview", "file_path", "chunk_size", "processed_time"]
+
 class ElasticsearchManager:
     """Elasticsearch manager for keyword search."""
     
     def __init__(self):
         self.es_config = config.elasticsearch
         self.client = self._initialize_client()
+        # Searches use index_name, which becomes an alias after the first
+        # blue/green rebuild; writes go to write_index
         self.index_name = self.es_config.get("index_name", "optimaize_keywords")
+        self.write_index = self.index_name
+        rebuild_config = self.es_config.get("rebuild", {}) or {}
+        self.keep_generations = rebuild_config.get("keep_generations", 1)
+        self.refresh_interval = rebuild_config.get("refresh_interval", "1s")
+        self.number_of_replicas = rebuild_config.get("number_of_replicas", 0)
+        
+        # Async mode: awaitable keyword search on an AsyncElasticsearch client, created on first use
+        self.async_mode = self.es_config.get("async_mode", False)
+        self.request_timeout = self.es_config.get("request_timeout", 10.0)
+        self.connections_per_node = self.es_config.get("connections_per_node", 32)
+        self.http_compress = self.es_config.get("http_compress", True)
+        self._async_client: Optional[AsyncElasticsearch] = None
+        
+        # Adaptive fuzziness: fall back to the fuzzy query only when exact terms match too little
+        keyword_config = self.es_config.get("keyword_search", {}) or {}
+        self.adaptive_fuzziness = keyword_config.get("adaptive_fuzziness", True)
+        self.fuzzy_min_hits = keyword_config.get("min_hits", 3)
+        self.fuzzy_min_score = keyword_config.get("min_score", 0.0)
+        self.keyword_phase_counts = {"exact": 0, "fuzzy": 0}
         
         # Ensure index exists
         self._ensure_index()
@@ -39,67 +64,125 @@ class ElasticsearchManager:
             if not self.client.indices.exists(index=self.index_name):
                 logger.info(f"Creating index: {self.index_name}")
                 
-                # Define index mapping
-                mapping = {
-                    "mappings": {
-                        "properties": {
-                            "chunk_id": {
-                                "type": "keyword"
-                            },
-                            "content": {
-                                "type": "text",
-                                "analyzer": "standard",
-                                "search_analyzer": "standard"
-                            },
-                            "source": {
-                                "type": "keyword"
-                            },
-                            "type": {
-                                "type": "keyword"
-                            },
-                            "chunk_index": {
-                                "type": "integer"
-                            },
-                            "chunk_size": {
-                                "type": "integer"
-                            },
-                            "content_preview": {
-                                "type": "text"
-                            },
-                            "file_path": {
-                                "type": "keyword"
-                            },
-                            "processed_time": {
-                                "type": "date"
-                            }
-                        }
-                    },
-                    "settings": {
-                        "number_of_shards": 1,
-                        "number_of_replicas": 0,
-                        "analysis": {
-                            "analyzer": {
-                                "custom_text_analyzer": {
-                                    "type": "standard",
-                                    "stopwords": "_english_"
-                                }
-                            }
-                        }
-                    }
-                }
-                
                 self.client.indices.create(
                     index=self.index_name,
-                    body=mapping
+                    body=self._index_body()
                 )
                 logger.info(f"Index {self.index_name} created successfully")
             else:
                 logger.info(f"Index {self.index_name} already exists")
+                
+                # Refresh is off while a bulk run is active. Only the bulk writer or
+                # an explicit restore_refresh_interval() turns it back on.
+                if self.get_refresh_interval(self.index_name) == "-1":
+                    logger.warning(f"Refresh is disabled on {self.index_name}; if no indexing run is active, "
+                                   f"restore it with: python main.py restore-refresh")
         
         except Exception as e:
             logger.error(f"Error ensuring index exists: {e}")
             raise
     
+    def _index_body(self) -> Dict[str, Any]:
+        """Build the index mappings and settings."""
+        mapping = {
+            "mappings": {
+                "properties": {
+                    "chunk_id": {
+                        "type": "keyword"
+                    },
+                    "content": {
+                        "type": "text",
+                        "analyzer": "standard",
+                        "search_analyzer": "standard"
+                    },
+                    "source": {
+                        "type": "keyword"
+                    },
+                    "type": {
+                        "type": "keyword"
+                    },
+                    "chunk_index": {
+                        "type": "integer"
+                    },
+                    "chunk_size": {
+                        "type": "integer"
+                    },
+                    "content_preview": {
+                        "type": "text"
+                    },
+                    "file_path": {
+                        "type": "keyword"
+                    },
+                    "processed_time": {
+                        "type": "date"
+                    }
+                }
+            },
+            "settings": {
+                "number_of_shards": 1,
+                "number_of_replicas": 0,
+                "analysis": {
+                    "analyzer": {
+                        "custom_text_analyzer": {
+                            "type": "standard",
+                            "stopwords": "_english_"
+                        }
+                    }
+                }
+            }
+        }
+        return mapping
+    
+    def build_document(self, chunk: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the indexed document for a chunk."""
+        metadata = chunk.get("metadata", {})
+        return {
+            "chunk_id": chunk.get("chunk_id"),
+            "content": chunk.get("content", ""),
+            "source": metadata.get("source", ""),
+            "type": metadata.get("type", ""),
+            "chunk_index": metadata.get("chunk_index", 0),
+            "chunk_size": metadata.get("chunk_size", 0),
+            "content_preview": metadata.get("content_preview", ""),
+            "file_path": metadata.get("source", ""),
+            "processed_time": metadata.get("processed_time")
+        }
+    
+    def get_refresh_interval(self, index: Optional[str] = None) -> Optional[str]:
+        """Get an index's explicit refresh_interval, or None if it uses the default."""
+        index = index or self.write_index
+        settings = self.client.indices.get_settings(index=index, name="index.refresh_interval")
+        for index_settings in settings.values():
+            return index_settings.get("settings", {}).get("index", {}).get("refresh_interval")
+        return None
+    
+    def set_refresh_interval(self, interval: Optional[str], index: Optional[str] = None):
+        """Set an index's refresh_interval; None restores the default."""
+        self.client.indices.put_settings(
+            index=index or self.write_index,
+            body={"index": {"refresh_interval": interval}}
+        )
+    
+    def restore_refresh_interval(self, index: Optional[str] = None) -> bool:
+        """Re-enable refresh left disabled by an interrupted bulk run.
+        
+        Only call this when no bulk writer is active on the index.
+        """
+        index = index or self.index_name
+        try:
+            if self.get_refresh_interval(index) != "-1":
+                logger.info(f"Refresh is already enabled on {index}")
+                return False
+            
+            self.set_refresh_interval(self.refresh_interval, index)
+            self.client.indices.refresh(index=index)
+            logger.info(f"Restored refresh_interval {self.refresh_interval} on {index}")
+            return True
+        
+        except Exception as e:
+            logger.error(f"Error restoring refresh on {index}: {e}")
+            return False
+    
     def add_chunks(self, chunks: List[Dict[str, Any]]) -> bool:
         """Add chunks to Elasticsearch for keyword search."""
         if not chunks:
@@ -110,37 +193,21 @@ class ElasticsearchManager:
             bulk_operations = []
             
             for chunk in chunks:
-                chunk_id = chunk.get("chunk_id")
-                content = chunk.get("content", "")
-                metadata = chunk.get("metadata", {})
-                
-                # Create document for indexing
-                doc = {
-                    "chunk_id": chunk_id,
-                    "content": content,
-                    "source": metadata.get("source", ""),
-                    "type": metadata.get("type", ""),
-                    "chunk_index": metadata.get("chunk_index", 0),
-                    "chunk_size": metadata.get("chunk_size", 0),
-                    "content_preview": metadata.get("content_preview", ""),
-                    "file_path": metadata.get("source", ""),
-                    "processed_time": metadata.get("processed_time")
-                }
-                
                 # Add index operation
                 bulk_operations.append({
                     "index": {
-                        "_index": self.index_name,
-                        "_id": chunk_id
+                        "_index": self.write_index,
+                        "_id": chunk.get("chunk_id")
                     }
                 })
-                bulk_operations.append(doc)
+                bulk_operations.append(self.build_document(chunk))
             
             if bulk_operations:
                 # Perform bulk indexing
+                # A rebuild generation is refreshed once when it's finished
                 response = self.client.bulk(
                     body=bulk_operations,
-                    refresh=True
+                    refresh=self.write_index == self.index_name
                 )
                 
                 # Check for errors
@@ -157,83 +224,204 @@ class ElasticsearchManager:
             logger.error(f"Error adding chunks to Elasticsearch: {e}")
             return False
     
-    def search_keywords(self, query: str, limit: int = 10, 
-                    filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-        """Search for documents using keyword matching."""
-        try:
-            # Build the search query
-            search_body = {
-                "query": {
-                    "bool": {
-                        "must": [
-                            {
-                                "multi_match": {
-                                    "query": query,
-                                    "fields": ["content^2", "source", "type"],
-                                    "type": "best_fields",
-                                    "fuzziness": "AUTO"
-                                }
-                            }
-                        ]
-                    }
-                },
-                "highlight": {
-                    "fields": {
+    def _keyword_search_body(self, query: str, limit: int, filters: Optional[Dict[str, Any]],
+                             fields: Optional[List[str]] = None,
+                             highlight: bool = True, fuzzy: bool = True) -> Dict[str, Any]:
+        """Build the keyword search request shared by the sync and async clients.
+        
+        fields limits _source to the listed fields; highlight=False skips
+        computing highlight fragments. fuzzy=False builds the exact phase:
+        exact terms, with a boost for documents containing the whole phrase.
+        """
+        terms_query = {
+            "multi_match": {
+                "query": query,
+                "fields": ["content^2", "source", "type"],
+                "type": "best_fields"
+            }
+        }
+        if fuzzy:
+            terms_query["multi_match"]["fuzziness"] = "AUTO"
+        
+        search_body = {
+            "query": {
+                "bool": {
+                    "must": [terms_query]
+                }
+            },
+            "_source": {"includes": fields} if fields else {"excludes": KEYWORD_SOURCE_EXCLUDES},
+            "size": limit
+        }
+        
+        if not fuzzy:
+            search_body["query"]["bool"]["should"] = [
+                {
+                    "match_phrase": {
                         "content": {
-                            "fragment_size": 150,
-                            "number_of_fragments": 3
+                            "query": query,
+                            "boost": 2
                         }
                     }
-                },
-                "size": limit
+                }
+            ]
+        
+        if highlight:
+            search_body["highlight"] = {
+                "fields": {
+                    "content": {
+                        "fragment_size": 150,
+                        "number_of_fragments": 3
+                    }
+                }
             }
+        
+        # Add filters if provided
+        if filters:
+            filter_clauses = []
+            for key, value in filters.items():
+                filter_clauses.append({"term": {key: value}})
             
-            # Add filters if provided
-            if filters:
-                filter_clauses = []
-                for key, value in filters.items():
-                    filter_clauses.append({"term": {key: value}})
-                
-                if filter_clauses:
-                    search_body["query"]["bool"]["filter"] = filter_clauses
+            if filter_clauses:
+                search_body["query"]["bool"]["filter"] = filter_clauses
+        
+        return search_body
+    
+    def _keyword_results(self, response: Dict[str, Any], phase: str) -> List[Dict[str, Any]]:
+        """Convert a keyword search response to the standard result format."""
+        results = []
+        for hit in response["hits"]["hits"]:
+            source = hit["_source"]
+            highlights = []
+            
+            # Extract highlights
+            if "highlight" in hit and "content" in hit["highlight"]:
+                highlights = hit["highlight"]["content"]
             
-            # Execute search
+            result = {
+                "chunk_id": hit["_id"],
+                "score": hit["_score"],
+                "content": source.get("content", ""),
+                "highlights": highlights,
+                "match_phase": phase,
+                "metadata": {
+                    "source": source.get("source", ""),
+                    "chunk_index": source.get("chunk_index", 0),
+                    "page_number": source.get("page_number"),
+                    "type": source.get("type"),
+                    "total_chunks": source.get("total_chunks")
+                }
+            }
+            results.append(result)
+        
+        logger.debug(f"Found {len(results)} keyword matches")
+        return results
+    
+    def _needs_fuzzy(self, response: Dict[str, Any], limit: int) -> bool:
+        """Check whether exact-phase hits are too few or too weak to answer the query."""
+        hits = response["hits"]["hits"]
+        if not hits or len(hits) < min(self.fuzzy_min_hits, limit):
+            return True
+        return (hits[0]["_score"] or 0.0) < self.fuzzy_min_score
+    
+    def _record_phase(self, phase: str):
+        """Count which phase answered a keyword search."""
+        self.keyword_phase_counts[phase] = self.keyword_phase_counts.get(phase, 0) + 1
+    
+    def search_keywords(self, query: str, limit: int = 10, 
+                    filters: Dict[str, Any] = None, fields: Optional[List[str]] = None,
+                    highlight: bool = True) -> List[Dict[str, Any]]:
+        """Search for documents using keyword matching."""
+        return self.search_keywords_phased(query, limit, filters, fields, highlight)[0]
+    
+    def search_keywords_phased(self, query: str, limit: int = 10,
+                               filters: Dict[str, Any] = None, fields: Optional[List[str]] = None,
+                               highlight: bool = True) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Search for documents using keyword matching, returning (results, phase).
+        
+        With adaptive fuzziness, an exact/phrase query runs first and the
+        fuzzy query only runs when it finds too few or too weak hits. phase
+        is the query the search finished in, even when it found nothing,
+        and None if the search failed.
+        """
+        try:
+            phase = "exact" if self.adaptive_fuzziness else "fuzzy"
             response = self.client.search(
                 index=self.index_name,
-                body=search_body
+                body=self._keyword_search_body(query, limit, filters, fields, highlight,
+                                               fuzzy=phase == "fuzzy")
             )
             
-            # Convert results to standard format
-            results = []
-            for hit in response["hits"]["hits"]:
-                source = hit["_source"]
-                highlights = []
-                
-                # Extract highlights
-                if "highlight" in hit and "content" in hit["highlight"]:
-                    highlights = hit["highlight"]["content"]
-                
-                result = {
-                    "chunk_id": hit["_id"],
-                    "score": hit["_score"],
-                    "content": source.get("content", ""),
-                    "highlights": highlights,
-                    "metadata": {
-                        "source": source.get("source", ""),
-                        "chunk_index": source.get("chunk_index", 0),
-                        "page_number": source.get("page_number"),
-                        "type": source.get("type"),
-                        "total_chunks": source.get("total_chunks")
-                    }
-                }
-                results.append(result)
+            if phase == "exact" and self._needs_fuzzy(response, limit):
+                phase = "fuzzy"
+                response = self.client.search(
+                    index=self.index_name,
+                    body=self._keyword_search_body(query, limit, filters, fields, highlight, fuzzy=True)
+                )
             
-            logger.debug(f"Found {len(results)} keyword matches")
-            return results
+            self._record_phase(phase)
+            return self._keyword_results(response, phase), phase
         
         except Exception as e:
             logger.error(f"Error in keyword search: {e}")
-            return []
+            return [], None
+    
+    def _get_async_client(self) -> AsyncElasticsearch:
+        """Get the async client, creating it on the running event loop."""
+        if self._async_client is None:
+            self._async_client = AsyncElasticsearch(
+                [self.es_config.get("url", "http://localhost:9200")],
+                connections_per_node=self.connections_per_node,
+                request_timeout=self.request_timeout,
+                http_compress=self.http_compress
+            )
+            logger.info(f"Async Elasticsearch client created (connections_per_node={self.connections_per_node}, "
+                        f"timeout={self.request_timeout}s, compress={self.http_compress})")
+        return self._async_client
+    
+    async def search_keywords_async(self, query: str, limit: int = 10,
+                                    filters: Dict[str, Any] = None, fields: Optional[List[str]] = None,
+                                    highlight: bool = True) -> List[Dict[str, Any]]:
+        """Awaitable search_keywords using the async client."""
+        return (await self.search_keywords_phased_async(query, limit, filters, fields, highlight))[0]
+    
+    async def search_keywords_phased_async(self, query: str, limit: int = 10,
+                                           filters: Dict[str, Any] = None,
+                                           fields: Optional[List[str]] = None,
+                                           highlight: bool = True) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Awaitable search_keywords_phased using the async client."""
+        try:
+            client = self._get_async_client()
+            phase = "exact" if self.adaptive_fuzziness else "fuzzy"
+            search_body = self._keyword_search_body(query, limit, filters, fields, highlight,
+                                                    fuzzy=phase == "fuzzy")
+            response = await asyncio.wait_for(
+                client.search(index=self.index_name, body=search_body),
+                timeout=self.request_timeout
+            )
+            
+            if phase == "exact" and self._needs_fuzzy(response, limit):
+                phase = "fuzzy"
+                search_body = self._keyword_search_body(query, limit, filters, fields, highlight, fuzzy=True)
+                response = await asyncio.wait_for(
+                    client.search(index=self.index_name, body=search_body),
+                    timeout=self.request_timeout
+                )
+            
+            self._record_phase(phase)
+            return self._keyword_results(response, phase), phase
+        
+        except asyncio.TimeoutError:
+            logger.error(f"Elasticsearch keyword search timed out after {self.request_timeout}s")
+            return [], None
+        except Exception as e:
+            logger.error(f"Error in keyword search: {e}")
+            return [], None
+    
+    async def close_async(self):
+        """Close the async client."""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
     
     def search_by_source(self, source_path: str, limit: int = 100) -> List[Dict[str, Any]]:
         """Get all chunks from a specific source file."""
@@ -276,7 +464,7 @@ class ElasticsearchManager:
         """Delete a chunk by ID."""
         try:
             self.client.delete(
-                index=self.index_name,
+                index=self.write_index,
                 id=chunk_id,
                 refresh=True
             )
@@ -302,7 +490,7 @@ class ElasticsearchManager:
             }
             
             response = self.client.delete_by_query(
-                index=self.index_name,
+                index=self.write_index,
                 body=delete_query,
                 refresh=True
             )
@@ -315,21 +503,54 @@ class ElasticsearchManager:
             logger.error(f"Error deleting chunks from source {source_path}: {e}")
             return False
     
+    def delete_chunks_by_sources(self, source_paths: List[str],
+                                 wait_for_completion: bool = False) -> bool:
+        """Delete all chunks from many source files with one delete-by-query.
+        
+        By default the delete runs as a background task without a refresh.
+        It only sees documents visible at its start, and documents
+        re-indexed since then are skipped as version conflicts.
+        """
+        if not source_paths:
+            return True
+        
+        try:
+            response = self.client.delete_by_query(
+                index=self.write_index,
+                body={"query": {"terms": {"source": list(source_paths)}}},
+                conflicts="proceed",
+                refresh=False,
+                wait_for_completion=wait_for_completion
+            )
+            
+            if wait_for_completion:
+                logger.info(f"Deleted {response.get('deleted', 0)} chunks from {len(source_paths)} sources")
+            else:
+                logger.info(f"Started deleting chunks from {len(source_paths)} sources (task {response.get('task')})")
+            return True
+        
+        except Exception as e:
+            logger.error(f"Error deleting chunks from {len(source_paths)} sources: {e}")
+            return False
+    
     def get_index_stats(self) -> Dict[str, Any]:
         """Get statistics about the index."""
         try:
             stats = self.client.indices.stats(index=self.index_name)
             count = self.client.count(index=self.index_name)
             
-            index_stats = stats["indices"][self.index_name]
+            # Stats are keyed by the concrete index behind the alias
+            concrete_index, index_stats = next(iter(stats["indices"].items()))
             
             return {
                 "index_name": self.index_name,
+                "concrete_index": concrete_index,
                 "document_count": count["count"],
                 "store_size": index_stats["total"]["store"]["size_in_bytes"],
                 "segments_count": index_stats["total"]["segments"]["count"],
                 "search_queries": index_stats["total"]["search"]["query_total"],
-                "indexing_operations": index_stats["total"]["indexing"]["index_total"]
+                "indexing_operations": index_stats["total"]["indexing"]["index_total"],
+                "keyword_phases": dict(self.keyword_phase_counts)
             }
         
         except Exception as e:
@@ -348,11 +569,92 @@ class ElasticsearchManager:
     def refresh_index(self) -> bool:
         """Refresh the index to make recent changes searchable."""
         try:
-            self.client.indices.refresh(index=self.index_name)
+            self.client.indices.refresh(index=self.write_index)
             return True
         except Exception as e:
             logger.error(f"Error refreshing index: {e}")
             return False
 
+    def begin_rebuild(self, generation: str) -> str:
+        """Create a fresh index generation tuned for bulk loading and direct writes to it."""
+        target = f"{self.index_name}_v{generation}"
+        logger.info(f"Creating rebuild index {target}")
+        
+        body = self._index_body()
+        body["settings"]["number_of_replicas"] = 0
+        body["settings"]["refresh_interval"] = "-1"
+        self.client.indices.create(index=target, body=body)
+        
+        self.write_index = target
+        return target
+    
+    def finish_rebuild(self, collect: bool = True) -> Dict[str, Any]:
+        """Restore search settings on the new generation, flip the alias and drop old generations.
+        
+        With collect=False old generations are left for collect_old_generations.
+        """
+        target = self.write_index
+        if target == self.index_name:
+            raise RuntimeError("No Elasticsearch rebuild in progress")
+        
+        self.client.indices.put_settings(
+            index=target,
+            body={"index": {
+                "refresh_interval": self.refresh_interval,
+                "number_of_replicas": self.number_of_replicas
+            }}
+        )
+        self.client.indices.refresh(index=target)
+        
+        # One atomic alias update: drop the alias from old generations, or
+        # remove a legacy concrete index with the alias's name
+        actions = [{"add": {"index": target, "alias": self.index_name}}]
+        previous = None
+        if self.client.indices.exists_alias(name=self.index_name):
+            previous = list(self.client.indices.get_alias(name=self.index_name).keys())
+            actions.insert(0, {"remove": {"index": "*", "alias": self.index_name}})
+        elif self.client.indices.exists(index=self.index_name):
+            previous = [self.index_name]
+            actions.insert(0, {"remove_index": {"index": self.index_name}})
+        
+        self.client.indices.update_aliases(body={"actions": actions})
+        logger.info(f"Alias {self.index_name} now points at {target} (was {previous})")
+        
+        self.write_index = self.index_name
+        removed = self.collect_old_generations(target) if collect else []
+        return {"alias": self.index_name, "index": target, "previous": previous, "removed": removed}
+    
+    def abort_rebuild(self):
+        """Drop an unfinished generation and direct writes back to the live alias."""
+        target = self.write_index
+        self.write_index = self.index_name
+        if target != self.index_name:
+            try:
+                self.client.indices.delete(index=target)
+                logger.info(f"Dropped unfinished rebuild index {target}")
+            except Exception as e:
+                logger.error(f"Error dropping rebuild index {target}: {e}")
+    
+    def collect_old_generations(self, current: str) -> List[str]:
+        """Delete generations older than the newest keep_generations previous ones."""
+        try:
+            generations = sorted(
+                (name for name in self.client.indices.get(index=f"{self.index_name}_v*").keys()
+                 if name != current),
+                reverse=True
+            )
+        except NotFoundError:
+            return []
+        
+        removed = []
+        for name in generations[self.keep_generations:]:
+            try:
+                self.client.indices.delete(index=name)
+                removed.append(name)
+                logger.info(f"Deleted old index generation {name}")
+            except Exception as e:
+                logger.error(f"Error deleting old index generation {name}: {e}")
+        return removed
+
 # Global Elasticsearch manager instance
 elasticsearch_manager = ElasticsearchManager()
\ No newline at end of file
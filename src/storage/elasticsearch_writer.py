@@ -0,0 +1,189 @@
+"""Streaming Elasticsearch bulk writer for the OptimAIze indexing pipeline."""
+
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Dict, Any, Optional, Tuple
+
+from src.config.settings import config
+from src.utils.logger import logger
+from src.storage.elasticsearch_client import ElasticsearchManager
+
+class ElasticsearchBulkWriter:
+    """Accumulate index actions across files and send them as pipelined bulk requests.
+
+    Requests are flushed at bulk.max_actions documents or bulk.max_bytes of
+    request body, with up to bulk.max_in_flight outstanding. Items rejected
+    with 429 are retried with exponential backoff. While the writer is open
+    the target index's refresh is disabled; close() restores it, refreshes
+    once and optionally force-merges.
+    """
+
+    def __init__(self, manager: ElasticsearchManager):
+        bulk_config = config.elasticsearch.get("bulk", {}) or {}
+        self.manager = manager
+        self.index = manager.write_index
+        self.max_actions = bulk_config.get("max_actions", 1000)
+        self.max_bytes = bulk_config.get("max_bytes", 5 * 1024 * 1024)
+        self.max_in_flight = bulk_config.get("max_in_flight", 2)
+        self.max_retries = bulk_config.get("max_retries", 3)
+        self.backoff_seconds = bulk_config.get("backoff_seconds", 1.0)
+        self.force_merge = bulk_config.get("force_merge", False)
+        self.max_num_segments = bulk_config.get("max_num_segments", 1)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="es-bulk")
+        self._in_flight: deque = deque()
+        self._closed = False
+
+        # Pending request
+        self._operations: List[Dict[str, Any]] = []
+        self._sources: List[str] = []
+        self._pending_bytes = 0
+
+        # Stats
+        self.docs_indexed = 0
+        self.docs_failed = 0
+        self.docs_retried = 0
+        self.requests_sent = 0
+        self.failed_sources = set()
+        self._start_time = time.time()
+
+        # Refresh is turned off for the run and restored in close()
+        self._previous_refresh: Optional[str] = None
+        self._refresh_disabled = False
+        try:
+            self._previous_refresh = manager.get_refresh_interval(self.index)
+            if self._previous_refresh != "-1":
+                manager.set_refresh_interval("-1", self.index)
+                self._refresh_disabled = True
+                logger.info(f"Disabled refresh on {self.index} for bulk indexing")
+        except Exception as e:
+            logger.warning(f"Could not disable refresh on {self.index}: {e}")
+
+    def add(self, chunks: List[Dict[str, Any]]) -> bool:
+        """Buffer index actions for chunks, flushing full requests."""
+        if self._closed:
+            raise RuntimeError("ElasticsearchBulkWriter is closed")
+
+        for chunk in chunks:
+            document = self.manager.build_document(chunk)
+            action = {"index": {"_index": self.index, "_id": chunk.get("chunk_id")}}
+
+            self._operations.extend((action, document))
+            self._sources.append(document["source"])
+            self._pending_bytes += len(json.dumps(document, default=str)) + 64
+
+            if len(self._sources) >= self.max_actions or self._pending_bytes >= self.max_bytes:
+                self._flush()
+
+        return True
+
+    def _flush(self):
+        """Send the pending request without waiting for it."""
+        if not self._operations:
+            return
+
+        operations, sources = self._operations, self._sources
+        self._operations, self._sources = [], []
+        self._pending_bytes = 0
+
+        # Bound the number of requests in flight
+        while len(self._in_flight) >= self.max_in_flight:
+            self._collect(self._in_flight.popleft())
+
+        self._in_flight.append(self._executor.submit(self._send, operations, sources))
+
+    def _send(self, operations: List[Dict[str, Any]], sources: List[str]) -> Tuple[int, int, List[str]]:
+        """Send one bulk request, retrying rejected items. Returns (indexed, retried, failed sources)."""
+        indexed = 0
+        retried = 0
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.manager.client.bulk(body=operations, refresh=False)
+            except Exception as e:
+                if getattr(e, "status_code", None) == 429 and attempt < self.max_retries:
+                    retried += len(sources)
+                    time.sleep(self.backoff_seconds * 2 ** attempt)
+                    continue
+                logger.error(f"Elasticsearch bulk request of {len(sources)} documents failed: {e}")
+                return indexed, retried, sources
+
+            if not response.get("errors"):
+                return indexed + len(sources), retried, []
+
+            # Keep only the items rejected for back-pressure for the next attempt
+            retry_operations, retry_sources, failed = [], [], []
+            for i, item in enumerate(response["items"]):
+                result = item.get("index", {})
+                if "error" not in result:
+                    indexed += 1
+                elif result.get("status") == 429 and attempt < self.max_retries:
+                    retry_operations.extend(operations[2 * i:2 * i + 2])
+                    retry_sources.append(sources[i])
+                else:
+                    logger.error(f"Elasticsearch rejected {result.get('_id')}: {result.get('error')}")
+                    failed.append(sources[i])
+
+            if not retry_operations:
+                return indexed, retried, failed
+
+            logger.warning(f"Retrying {len(retry_sources)} documents rejected by Elasticsearch")
+            retried += len(retry_sources)
+            operations, sources = retry_operations, retry_sources
+            time.sleep(self.backoff_seconds * 2 ** attempt)
+
+        return indexed, retried, sources
+
+    def _collect(self, future: Future):
+        """Wait for an in-flight request and record its outcome."""
+        indexed, retried, failed = future.result()
+        self.requests_sent += 1
+        self.docs_indexed += indexed
+        self.docs_retried += retried
+        self.docs_failed += len(failed)
+        self.failed_sources.update(failed)
+
+    def close(self) -> Dict[str, Any]:
+        """Flush remaining actions, restore refresh and make everything searchable."""
+        if self._closed:
+            return self.get_stats()
+
+        try:
+            self._flush()
+            while self._in_flight:
+                self._collect(self._in_flight.popleft())
+        finally:
+            self._executor.shutdown(wait=True)
+            self._closed = True
+
+            try:
+                if self._refresh_disabled:
+                    self.manager.set_refresh_interval(self._previous_refresh, self.index)
+                self.manager.client.indices.refresh(index=self.index)
+                if self.force_merge:
+                    logger.info(f"Force-merging {self.index} to {self.max_num_segments} segments")
+                    self.manager.client.indices.forcemerge(index=self.index, max_num_segments=self.max_num_segments)
+            except Exception as e:
+                logger.error(f"Error finishing bulk indexing on {self.index}: {e}")
+
+        stats = self.get_stats()
+        logger.info(f"Elasticsearch bulk indexing complete: {stats['docs_indexed']} documents in "
+                    f"{stats['requests_sent']} requests, {stats['docs_per_sec']:.0f} docs/s")
+        return stats
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get throughput, retry and failure counts."""
+        elapsed = time.time() - self._start_time
+        return {
+            "index": self.index,
+            "docs_indexed": self.docs_indexed,
+            "docs_failed": self.docs_failed,
+            "docs_retried": self.docs_retried,
+            "requests_sent": self.requests_sent,
+            "in_flight": len(self._in_flight),
+            "failed_sources": sorted(self.failed_sources),
+            "elapsed_seconds": elapsed,
+            "docs_per_sec": self.docs_indexed / elapsed if elapsed > 0 else 0.0
+        }
@@ -1,15 +1,31 @@
 """Qdrant vector database client for OptimAIze."""
 
+import asyncio
+import time
 import uuid
 from typing import List, Dict, Any, Optional, Union
+import httpx
 import numpy as np
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, AsyncQdrantClient
 from qdrant_client.models import (
     VectorParams, Distance, PointStruct, Filter, 
-    FieldCondition, MatchValue, CollectionInfo
+    FieldCondition, MatchValue, MatchAny, CollectionInfo,
+    HnswConfigDiff, NamedVector, Batch, PayloadSchemaType,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+    SearchParams, QuantizationSearchParams, VectorParamsDiff, Disabled,
+    OptimizersConfigDiff, CollectionStatus, CreateAliasOperation, CreateAlias,
+    DeleteAliasOperation, DeleteAlias, InitFrom
 )
 from src.config.settings import config
 from src.utils.logger import logger
+from src.indexing.matryoshka import truncate_embeddings, rescore
+
+# Named vectors used when Matryoshka search is enabled
+MATRYOSHKA_VECTOR = "matryoshka"
+FULL_VECTOR = "full"
+
+# Generation a pre-alias collection is copied into by migrate_legacy_collection; sorts oldest
+LEGACY_GENERATION = "00000000000000"
 
 class QdrantManager:
     """Qdrant vector database manager."""
@@ -17,9 +33,42 @@ class QdrantManager:
     def __init__(self):
         self.qdrant_config = config.qdrant
         self.client = self._initialize_client()
+        # Searches use collection_name, which becomes an alias after the first
+        # blue/green rebuild; writes go to write_collection
         self.collection_name = self.qdrant_config.get("collection_name", "optimaize_documents")
+        self.write_collection = self.collection_name
+        rebuild_config = self.qdrant_config.get("rebuild", {}) or {}
+        self.keep_generations = rebuild_config.get("keep_generations", 1)
+        self.indexing_threshold = rebuild_config.get("indexing_threshold", 20000)
+        self.optimize_timeout = rebuild_config.get("optimize_timeout", 600)
         self.vector_size = self.qdrant_config.get("vector_size", 768)
         
+        # Matryoshka: search truncated vectors in RAM, rescore with full vectors on disk
+        matryoshka_config = self.qdrant_config.get("matryoshka", {}) or {}
+        self.matryoshka_enabled = matryoshka_config.get("enabled", False)
+        self.matryoshka_dim = matryoshka_config.get("dim", 256)
+        self.matryoshka_oversample = matryoshka_config.get("oversample", 4)
+        
+        # Async mode: awaitable methods on an AsyncQdrantClient, created on first use
+        self.async_mode = self.qdrant_config.get("async_mode", False)
+        self.call_timeout = self.qdrant_config.get("timeout", 10.0)
+        self.pool_size = self.qdrant_config.get("pool_size", 32)
+        self._async_client: Optional[AsyncQdrantClient] = None
+        
+        # Storage profile: vector placement, quantization, HNSW build and search params
+        profile = self.qdrant_config.get("storage_profile", {}) or {}
+        self.vectors_on_disk = profile.get("on_disk", False)
+        self.quantization_config = profile.get("quantization", {}) or {}
+        self.hnsw_config = profile.get("hnsw", {}) or {}
+        self.search_config = profile.get("search", {}) or {}
+        
+        # Payload fields indexed for filtered searches and per-source deletes
+        self.payload_indexes = self.qdrant_config.get("payload_indexes", {
+            "source": "keyword",
+            "type": "keyword",
+            "chunk_index": "integer"
+        }) or {}
+        
         # Handle distance metric with proper mapping
         distance_str = self.qdrant_config.get("distance", "COSINE").upper()
         if hasattr(Distance, distance_str):
@@ -35,7 +84,11 @@ class QdrantManager:
         """Initialize Qdrant client."""
         try:
             url = self.qdrant_config.get("url", "http://localhost:6333")
-            client = QdrantClient(url=url)
+            client = QdrantClient(
+                url=url,
+                prefer_grpc=self.qdrant_config.get("prefer_grpc", False),
+                grpc_port=self.qdrant_config.get("grpc_port", 6334)
+            )
             
             # Test connection
             collections = client.get_collections()
@@ -49,64 +102,390 @@ class QdrantManager:
     def _ensure_collection(self):
         """Ensure the collection exists, create if it doesn't."""
         try:
-            # Check if collection exists
+            # Check if collection exists, directly or behind an alias
             collections = self.client.get_collections()
             collection_names = [col.name for col in collections.collections]
+            collection_names.extend(self._get_aliases())
             
             if self.collection_name not in collection_names:
                 logger.info(f"Creating collection: {self.collection_name}")
                 self.client.create_collection(
                     collection_name=self.collection_name,
-                    vectors_config=VectorParams(
-                        size=self.vector_size,
-                        distance=self.distance
-                    )
+                    vectors_config=self._vectors_config(),
+                    hnsw_config=self._hnsw_config_diff(),
+                    quantization_config=self._quantization()
                 )
                 logger.info(f"Collection {self.collection_name} created successfully")
             else:
                 logger.info(f"Collection {self.collection_name} already exists")
+                self._check_vector_layout()
+                self._check_storage_profile()
+            
+            # Also migrates existing collections created before the indexes were configured
+            self.ensure_payload_indexes()
         
         except Exception as e:
             logger.error(f"Error ensuring collection exists: {e}")
             raise
     
-    def add_chunks(self, chunks: List[Dict[str, Any]]) -> bool:
-        """Add chunks with embeddings to Qdrant."""
+    def ensure_payload_indexes(self, collection_name: Optional[str] = None) -> List[str]:
+        """Create any configured payload indexes the collection is missing.
+        
+        Returns the names of the fields that were indexed.
+        """
+        collection_name = collection_name or self.collection_name
+        created = []
+        try:
+            payload_schema = self.client.get_collection(collection_name).payload_schema or {}
+        except Exception as e:
+            logger.error(f"Error reading payload schema of {collection_name}: {e}")
+            return created
+        
+        for field_name, field_type in self.payload_indexes.items():
+            try:
+                schema_type = PayloadSchemaType(field_type)
+            except ValueError:
+                logger.warning(f"Unknown payload index type '{field_type}' for field {field_name}, skipping")
+                continue
+            
+            existing = payload_schema.get(field_name)
+            if existing is not None:
+                if existing.data_type != schema_type:
+                    logger.warning(f"Payload index on {field_name} is {existing.data_type.value}, "
+                                   f"config wants {schema_type.value}; drop it to re-create")
+                continue
+            
+            try:
+                self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field_name,
+                    field_schema=schema_type,
+                    wait=True
+                )
+                created.append(field_name)
+                logger.info(f"Created {schema_type.value} payload index on {field_name}")
+            except Exception as e:
+                logger.error(f"Error creating payload index on {field_name}: {e}")
+        
+        return created
+    
+    def _vectors_config(self) -> Union[VectorParams, Dict[str, VectorParams]]:
+        """Build the vector layout for a new collection."""
+        if not self.matryoshka_enabled:
+            return VectorParams(size=self.vector_size, distance=self.distance, on_disk=self.vectors_on_disk)
+        
+        return {
+            # First-stage search: truncated prefix, HNSW indexed and held in RAM
+            MATRYOSHKA_VECTOR: VectorParams(
+                size=self.matryoshka_dim,
+                distance=self.distance,
+                on_disk=False
+            ),
+            # Rescoring only: full vector on disk with no HNSW graph
+            FULL_VECTOR: VectorParams(
+                size=self.vector_size,
+                distance=self.distance,
+                on_disk=True,
+                hnsw_config=HnswConfigDiff(m=0)
+            )
+        }
+    
+    def _get_aliases(self) -> Dict[str, str]:
+        """Map alias names to the collections they point at."""
+        return {
+            alias.alias_name: alias.collection_name
+            for alias in self.client.get_aliases().aliases
+        }
+    
+    def _is_legacy_collection(self) -> bool:
+        """Check whether collection_name is a plain collection rather than an alias."""
+        if self.collection_name in self._get_aliases():
+            return False
+        return self.collection_name in [col.name for col in self.client.get_collections().collections]
+    
+    def _check_not_legacy(self):
+        """Refuse to rebuild while the live data is a plain collection with the alias's name."""
+        if self._is_legacy_collection():
+            raise RuntimeError(
+                f"Qdrant collection {self.collection_name} is a plain collection, and Qdrant can't create "
+                f"an alias with the same name. Move it behind an alias first with "
+                f"`python main.py migrate-alias`, or remove it, then rerun the rebuild."
+            )
+    
+    def migrate_legacy_collection(self) -> Dict[str, Any]:
+        """Copy a plain collection into a generation and replace it with an alias to that copy.
+        
+        Searches fail briefly between dropping the plain collection and
+        creating the alias, so run this in a maintenance window.
+        """
+        if not self._is_legacy_collection():
+            raise RuntimeError(f"{self.collection_name} is not a plain collection, nothing to migrate")
+        
+        target = f"{self.collection_name}_v{LEGACY_GENERATION}"
+        source_info = self.client.get_collection(self.collection_name)
+        logger.info(f"Copying legacy collection {self.collection_name} into {target}")
+        self.client.create_collection(
+            collection_name=target,
+            vectors_config=source_info.config.params.vectors,
+            hnsw_config=self._hnsw_config_diff(),
+            quantization_config=self._quantization(),
+            init_from=InitFrom(collection=self.collection_name)
+        )
+        self.ensure_payload_indexes(target)
+        
+        # Only drop the original once the copy holds every point
+        deadline = time.time() + self.optimize_timeout
+        while self.client.count(target, exact=True).count < source_info.points_count:
+            if time.time() > deadline:
+                raise RuntimeError(f"Copy of {self.collection_name} into {target} incomplete after "
+                                   f"{self.optimize_timeout}s, legacy collection left in place")
+            time.sleep(2)
+        
+        self.client.delete_collection(self.collection_name)
+        self.client.update_collection_aliases(change_aliases_operations=[CreateAliasOperation(
+            create_alias=CreateAlias(collection_name=target, alias_name=self.collection_name)
+        )])
+        logger.info(f"Legacy collection {self.collection_name} now served by alias to {target}")
+        return {"alias": self.collection_name, "collection": target, "points": source_info.points_count}
+    
+    def begin_rebuild(self, generation: str) -> str:
+        """Create a fresh collection generation and direct writes to it.
+        
+        HNSW indexing is deferred (indexing_threshold 0) until finish_rebuild,
+        so points are only appended during the bulk load.
+        """
+        self._check_not_legacy()
+        target = f"{self.collection_name}_v{generation}"
+        logger.info(f"Creating rebuild collection {target}")
+        
+        self.client.create_collection(
+            collection_name=target,
+            vectors_config=self._vectors_config(),
+            hnsw_config=self._hnsw_config_diff(),
+            quantization_config=self._quantization(),
+            optimizers_config=OptimizersConfigDiff(indexing_threshold=0)
+        )
+        self.ensure_payload_indexes(target)
+        self.write_collection = target
+        return target
+    
+    def finish_rebuild(self, collect: bool = True) -> Dict[str, Any]:
+        """Build the new generation's index, point the alias at it and drop old generations.
+        
+        With collect=False old generations are left for collect_old_generations,
+        so the flip can still be rolled back.
+        """
+        target = self.write_collection
+        if target == self.collection_name:
+            raise RuntimeError("No Qdrant rebuild in progress")
+        self._check_not_legacy()
+        
+        # Re-enable indexing and wait for the optimizer so the flip never exposes an unindexed collection
+        self.client.update_collection(
+            collection_name=target,
+            optimizers_config=OptimizersConfigDiff(indexing_threshold=self.indexing_threshold)
+        )
+        deadline = time.time() + self.optimize_timeout
+        while self.client.get_collection(target).status != CollectionStatus.GREEN:
+            if time.time() > deadline:
+                logger.warning(f"{target} still optimizing after {self.optimize_timeout}s, flipping anyway")
+                break
+            time.sleep(2)
+        
+        aliases = self._get_aliases()
+        previous = aliases.get(self.collection_name)
+        
+        operations = []
+        if self.collection_name in aliases:
+            operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=self.collection_name)))
+        operations.append(CreateAliasOperation(
+            create_alias=CreateAlias(collection_name=target, alias_name=self.collection_name)
+        ))
+        self.client.update_collection_aliases(change_aliases_operations=operations)
+        logger.info(f"Alias {self.collection_name} now points at {target} (was {previous})")
+        
+        self.write_collection = self.collection_name
+        removed = self.collect_old_generations(target) if collect else []
+        return {"alias": self.collection_name, "collection": target, "previous": previous, "removed": removed}
+    
+    def rollback_rebuild(self, flip: Dict[str, Any]):
+        """Undo a finish_rebuild: point the alias back at the previous generation and drop the new one."""
+        operations = [DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=self.collection_name))]
+        if flip["previous"]:
+            operations.append(CreateAliasOperation(
+                create_alias=CreateAlias(collection_name=flip["previous"], alias_name=self.collection_name)
+            ))
+        self.client.update_collection_aliases(change_aliases_operations=operations)
+        logger.info(f"Alias {self.collection_name} rolled back to {flip['previous']}")
+        
+        try:
+            self.client.delete_collection(flip["collection"])
+        except Exception as e:
+            logger.error(f"Error dropping rolled back collection {flip['collection']}: {e}")
+    
+    def abort_rebuild(self):
+        """Drop an unfinished generation and direct writes back to the live alias."""
+        target = self.write_collection
+        self.write_collection = self.collection_name
+        if target != self.collection_name:
+            try:
+                self.client.delete_collection(target)
+                logger.info(f"Dropped unfinished rebuild collection {target}")
+            except Exception as e:
+                logger.error(f"Error dropping rebuild collection {target}: {e}")
+    
+    def collect_old_generations(self, current: str) -> List[str]:
+        """Delete generations older than the newest keep_generations previous ones."""
+        prefix = f"{self.collection_name}_v"
+        generations = sorted(
+            (col.name for col in self.client.get_collections().collections
+             if col.name.startswith(prefix) and col.name != current),
+            reverse=True
+        )
+        
+        removed = []
+        for name in generations[self.keep_generations:]:
+            try:
+                self.client.delete_collection(name)
+                removed.append(name)
+                logger.info(f"Deleted old collection generation {name}")
+            except Exception as e:
+                logger.error(f"Error deleting old collection generation {name}: {e}")
+        return removed
+    
+    def _hnsw_config_diff(self) -> Optional[HnswConfigDiff]:
+        """Build the configured HNSW index parameters."""
+        if not self.hnsw_config:
+            return None
+        return HnswConfigDiff(
+            m=self.hnsw_config.get("m"),
+            ef_construct=self.hnsw_config.get("ef_construct")
+        )
+    
+    def _quantization(self) -> Optional[ScalarQuantization]:
+        """Build the configured scalar quantization, or None when disabled."""
+        if not self.quantization_config.get("enabled", False):
+            return None
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(
+                type=ScalarType.INT8,
+                quantile=self.quantization_config.get("quantile", 0.99),
+                always_ram=self.quantization_config.get("always_ram", True)
+            )
+        )
+    
+    def storage_profile_drift(self) -> Dict[str, Any]:
+        """Collect the collection settings that differ from the storage profile.
+        
+        Returns update_collection keyword arguments, empty when the
+        collection already matches.
+        """
+        changes = {}
+        params = self.client.get_collection(self.collection_name).config
+        
+        hnsw = self._hnsw_config_diff()
+        if hnsw and (hnsw.m not in (None, params.hnsw_config.m)
+                     or hnsw.ef_construct not in (None, params.hnsw_config.ef_construct)):
+            changes["hnsw_config"] = hnsw
+        
+        quantization = self._quantization()
+        current = params.quantization_config
+        if quantization is not None:
+            current_scalar = getattr(current, "scalar", None)
+            if (current_scalar is None
+                    or current_scalar.quantile != quantization.scalar.quantile
+                    or current_scalar.always_ram != quantization.scalar.always_ram):
+                changes["quantization_config"] = quantization
+        elif current is not None:
+            changes["quantization_config"] = Disabled.DISABLED
+        
+        vectors = params.params.vectors
+        if not isinstance(vectors, dict) and bool(vectors.on_disk) != self.vectors_on_disk:
+            changes["vectors_config"] = {"": VectorParamsDiff(on_disk=self.vectors_on_disk)}
+        
+        return changes
+    
+    def _check_storage_profile(self):
+        """Warn when an existing collection doesn't match the storage profile."""
+        try:
+            changes = self.storage_profile_drift()
+            if changes:
+                logger.warning(f"{self.collection_name} differs from the storage profile in {sorted(changes)}; "
+                               f"run `python main.py migrate-storage` to update it")
+        except Exception as e:
+            logger.warning(f"Could not check storage profile of {self.collection_name}: {e}")
+    
+    def apply_storage_profile(self) -> Dict[str, Any]:
+        """Update an existing collection to match the storage profile.
+        
+        Only settings that differ are sent; Qdrant rebuilds the affected
+        segments in the background. Returns the changes that were applied.
+        """
+        changes = self.storage_profile_drift()
+        if changes:
+            self.client.update_collection(collection_name=self.collection_name, **changes)
+            logger.info(f"Applied storage profile to {self.collection_name}: {sorted(changes)}")
+        return changes
+    
+    def _search_params(self, hnsw_ef: Optional[int], rescore_quantized: Optional[bool]) -> Optional[SearchParams]:
+        """Build search params from per-call overrides and the storage profile."""
+        hnsw_ef = hnsw_ef or self.search_config.get("hnsw_ef")
+        quantization = None
+        if self.quantization_config.get("enabled", False):
+            quantization = QuantizationSearchParams(
+                rescore=rescore_quantized if rescore_quantized is not None else self.search_config.get("rescore", True),
+                oversampling=self.search_config.get("oversampling")
+            )
+        
+        if hnsw_ef is None and quantization is None:
+            return None
+        return SearchParams(hnsw_ef=hnsw_ef, quantization=quantization)
+    
+    def _check_vector_layout(self):
+        """Warn when an existing collection doesn't match the configured vector layout."""
+        try:
+            vectors = self.client.get_collection(self.collection_name).config.params.vectors
+            is_named = isinstance(vectors, dict)
+            if self.matryoshka_enabled and not (is_named and MATRYOSHKA_VECTOR in vectors):
+                logger.error(f"Matryoshka is enabled but {self.collection_name} has no "
+                             f"'{MATRYOSHKA_VECTOR}' vector; re-create the collection and reindex")
+            elif not self.matryoshka_enabled and is_named:
+                logger.error(f"{self.collection_name} uses named vectors but Matryoshka is disabled; "
+                             f"enable qdrant.matryoshka or re-create the collection")
+        except Exception as e:
+            logger.warning(f"Could not check vector layout of {self.collection_name}: {e}")
+    
+    def _point_vector(self, embedding: Union[np.ndarray, List[float]]) -> Union[List[float], Dict[str, List[float]]]:
+        """Build the stored vector(s) for one embedding."""
+        if not self.matryoshka_enabled:
+            return embedding.tolist() if isinstance(embedding, np.ndarray) else embedding
+        
+        return {
+            MATRYOSHKA_VECTOR: truncate_embeddings(embedding, self.matryoshka_dim).tolist(),
+            FULL_VECTOR: np.asarray(embedding, dtype=np.float32).tolist()
+        }
+    
+    def add_chunks(self, chunks: List[Dict[str, Any]], embeddings: Optional[np.ndarray] = None) -> bool:
+        """Add chunks with embeddings to Qdrant.
+        
+        When embeddings is given, each chunk's "embedding_row" indexes into it
+        and the matrix is uploaded in batches without per-point objects.
+        """
         if not chunks:
             return True
         
+        if embeddings is not None:
+            return self._upload_matrix(chunks, embeddings)
+        
         try:
-            points = []
-            for chunk in chunks:
-                embedding = chunk.get("embedding")
-                if embedding is None:
-                    logger.warning(f"No embedding found for chunk {chunk.get('chunk_id', 'unknown')}")
-                    continue
-                
-                # Convert numpy array to list if needed
-                if isinstance(embedding, np.ndarray):
-                    embedding = embedding.tolist()
-                
-                # Prepare metadata (exclude embedding to avoid duplication)
-                payload = chunk.get("metadata", {}).copy()
-                payload["content"] = chunk.get("content", "")
-                payload["chunk_id"] = chunk.get("chunk_id")
-                
-                # Create point
-                point = PointStruct(
-                    id=chunk.get("chunk_id"),
-                    vector=embedding,
-                    payload=payload
-                )
-                points.append(point)
-            
+            points = self._build_points(chunks)
             if not points:
                 logger.warning("No valid points to add to Qdrant")
                 return False
             
             # Upload points
             self.client.upsert(
-                collection_name=self.collection_name,
+                collection_name=self.write_collection,
                 points=points
             )
             
@@ -117,47 +496,88 @@ class QdrantManager:
             logger.error(f"Error adding chunks to Qdrant: {e}")
             return False
     
-    def search_similar(self, query_embedding: Union[np.ndarray, List[float]], 
-                      limit: int = 10, score_threshold: float = 0.0,
-                      filter_conditions: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Search for similar chunks in Qdrant."""
-        try:
-            # Convert numpy array to list if needed
-            if isinstance(query_embedding, np.ndarray):
-                query_embedding = query_embedding.tolist()
-            
-            # Prepare filter if provided
-            query_filter = None
-            if filter_conditions:
-                query_filter = self._build_filter(filter_conditions)
+    def _build_points(self, chunks: List[Dict[str, Any]]) -> List[PointStruct]:
+        """Build points from chunks carrying their own "embedding"."""
+        points = []
+        for chunk in chunks:
+            embedding = chunk.get("embedding")
+            if embedding is None:
+                logger.warning(f"No embedding found for chunk {chunk.get('chunk_id', 'unknown')}")
+                continue
             
-            # Perform search
-            search_results = self.client.search(
-                collection_name=self.collection_name,
-                query_vector=query_embedding,
-                limit=limit,
-                score_threshold=score_threshold,
-                query_filter=query_filter,
-                with_payload=True,
-                with_vectors=False
+            # Create point (payload excludes embedding to avoid duplication)
+            point = PointStruct(
+                id=chunk.get("chunk_id"),
+                vector=self._point_vector(embedding),
+                payload=self.build_payload(chunk)
             )
+            points.append(point)
+        return points
+    
+    def _upload_matrix(self, chunks: List[Dict[str, Any]], embeddings: np.ndarray) -> bool:
+        """Upload chunks whose vectors are rows of a float32 matrix."""
+        try:
+            rows = np.array([chunk["embedding_row"] for chunk in chunks], dtype=np.int64)
+            ids = [chunk.get("chunk_id") for chunk in chunks]
+            payloads = [self.build_payload(chunk) for chunk in chunks]
             
-            # Format results
-            results = []
-            for result in search_results:
-                results.append({
-                    "chunk_id": result.id,
-                    "score": result.score,
-                    "content": result.payload.get("content", ""),
-                    "metadata": {k: v for k, v in result.payload.items() if k != "content"}
-                })
+            self.client.upload_collection(
+                collection_name=self.write_collection,
+                vectors=self._matrix_vectors(embeddings[rows]),
+                payload=payloads,
+                ids=ids,
+                batch_size=self.qdrant_config.get("batch_size", 100)
+            )
             
-            logger.info(f"Found {len(results)} similar chunks")
-            return results
+            logger.info(f"Successfully uploaded {len(ids)} chunks to Qdrant")
+            return True
         
         except Exception as e:
-            logger.error(f"Error searching Qdrant: {e}")
-            return []
+            logger.error(f"Error uploading chunks to Qdrant: {e}")
+            return False
+    
+    def build_payload(self, chunk: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the stored payload for a chunk."""
+        payload = chunk.get("metadata", {}).copy()
+        payload["content"] = chunk.get("content", "")
+        payload["chunk_id"] = chunk.get("chunk_id")
+        return payload
+    
+    def _matrix_vectors(self, vectors: np.ndarray) -> Union[np.ndarray, Dict[str, np.ndarray]]:
+        """Build the stored vector matrices for a batch of embeddings."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if not self.matryoshka_enabled:
+            return vectors
+        return {
+            MATRYOSHKA_VECTOR: truncate_embeddings(vectors, self.matryoshka_dim),
+            FULL_VECTOR: vectors
+        }
+    
+    def upsert_matrix(self, ids: List[str], vectors: np.ndarray,
+                      payloads: List[Dict[str, Any]], wait: bool = True):
+        """Upsert one batch of points given as a float32 matrix, raising on failure.
+        
+        The matrix goes to upload_collection as numpy, like _upload_matrix,
+        instead of being converted to per-point float lists.
+        """
+        self.client.upload_collection(
+            collection_name=self.write_collection,
+            vectors=self._matrix_vectors(vectors),
+            payload=payloads,
+            ids=ids,
+            batch_size=max(len(ids), 1),
+            parallel=1,
+            wait=wait
+        )
+    
+    def _matrix_batch(self, ids: List[str], vectors: np.ndarray, payloads: List[Dict[str, Any]]) -> Batch:
+        """Build a columnar upsert batch from a float32 matrix, for clients without upload_collection."""
+        batch_vectors = self._matrix_vectors(vectors)
+        if isinstance(batch_vectors, dict):
+            batch_vectors = {name: matrix.tolist() for name, matrix in batch_vectors.items()}
+        else:
+            batch_vectors = batch_vectors.tolist()
+        return Batch(ids=ids, vectors=batch_vectors, payloads=payloads)
     
     def _build_filter(self, conditions: Dict[str, Any]) -> Filter:
         """Build Qdrant filter from conditions."""
@@ -201,7 +621,7 @@ class QdrantManager:
         """Delete a chunk by ID."""
         try:
             self.client.delete(
-                collection_name=self.collection_name,
+                collection_name=self.write_collection,
                 points_selector=[chunk_id]
             )
             logger.info(f"Deleted chunk {chunk_id}")
@@ -214,19 +634,9 @@ class QdrantManager:
     def delete_chunks_by_source(self, source_path: str) -> bool:
         """Delete all chunks from a specific source file."""
         try:
-            # Create filter for source path
-            delete_filter = Filter(
-                must=[
-                    FieldCondition(
-                        key="source",
-                        match=MatchValue(value=source_path)
-                    )
-                ]
-            )
-            
             self.client.delete(
-                collection_name=self.collection_name,
-                points_selector=delete_filter
+                collection_name=self.write_collection,
+                points_selector=self._source_filter(source_path)
             )
             
             logger.info(f"Deleted chunks from source: {source_path}")
@@ -236,68 +646,267 @@ class QdrantManager:
             logger.error(f"Error deleting chunks from source {source_path}: {e}")
             return False
         
-    def search_similar(self, query_embedding: List[float], limit: int = 10, 
-                    score_threshold: float = 0.0, filter_conditions: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-        """Search for similar vectors in the collection."""
+    def delete_chunks_by_sources(self, source_paths: List[str], wait: bool = False) -> bool:
+        """Delete all chunks from many source files in one request.
+        
+        With wait=False the delete is queued and applied before any
+        operations sent after it.
+        """
+        if not source_paths:
+            return True
+        
         try:
-            # Build filter conditions for Qdrant
-            filter_query = None
-            if filter_conditions:
-                filter_query = models.Filter(
+            self.client.delete(
+                collection_name=self.write_collection,
+                points_selector=Filter(
                     must=[
-                        models.FieldCondition(
-                            key=key,
-                            match=models.MatchValue(value=value)
-                        ) for key, value in filter_conditions.items()
+                        FieldCondition(
+                            key="source",
+                            match=MatchAny(any=list(source_paths))
+                        )
                     ]
-                )
-            
-            # Perform the search
-            search_result = self.client.search(
-                collection_name=self.collection_name,
-                query_vector=query_embedding,
-                limit=limit,
-                score_threshold=score_threshold,
-                query_filter=filter_query,
-                with_payload=True,
-                with_vectors=False
+                ),
+                wait=wait
             )
             
-            # Convert results to standard format
-            results = []
-            for point in search_result:
-                result = {
-                    "chunk_id": str(point.id),
-                    "score": point.score,
-                    "content": point.payload.get("content", ""),
-                    "metadata": {
-                        "source": point.payload.get("source", ""),
-                        "chunk_index": point.payload.get("chunk_index", 0),
-                        "page_number": point.payload.get("page_number"),
-                        "type": point.payload.get("type"),
-                        "total_chunks": point.payload.get("total_chunks")
-                    }
+            logger.info(f"Deleted chunks from {len(source_paths)} sources")
+            return True
+        
+        except Exception as e:
+            logger.error(f"Error deleting chunks from {len(source_paths)} sources: {e}")
+            return False
+    
+    def _source_filter(self, source_path: str) -> Filter:
+        """Build a filter matching every chunk of a source file."""
+        return Filter(
+            must=[
+                FieldCondition(
+                    key="source",
+                    match=MatchValue(value=source_path)
+                )
+            ]
+        )
+    
+    def search_similar(self, query_embedding: List[float], limit: int = 10, 
+                    score_threshold: float = 0.0, filter_conditions: Dict[str, Any] = None,
+                    hnsw_ef: Optional[int] = None, rescore: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """Search for similar vectors in the collection.
+        
+        hnsw_ef and rescore override the storage profile's search settings;
+        rescore only applies when scalar quantization is enabled.
+        """
+        try:
+            search_kwargs = self._search_kwargs(query_embedding, limit, score_threshold, filter_conditions,
+                                                hnsw_ef, rescore)
+            search_result = self.client.search(**search_kwargs)
+            return self._finish_search(search_result, query_embedding, limit, score_threshold)
+        
+        except Exception as e:
+            logger.error(f"Error searching similar vectors: {e}")
+            return []
+    
+    def _search_kwargs(self, query_embedding: Union[np.ndarray, List[float]], limit: int,
+                       score_threshold: float, filter_conditions: Optional[Dict[str, Any]],
+                       hnsw_ef: Optional[int] = None, rescore_quantized: Optional[bool] = None) -> Dict[str, Any]:
+        """Build the search request shared by the sync and async clients."""
+        search_params = self._search_params(hnsw_ef, rescore_quantized)
+
+        # Build filter conditions for Qdrant
+        filter_query = None
+        if filter_conditions:
+            filter_query = Filter(
+                must=[
+                    FieldCondition(
+                        key=key,
+                        match=MatchValue(value=value)
+                    ) for key, value in filter_conditions.items()
+                ]
+            )
+        
+        if self.matryoshka_enabled:
+            # Search truncated vectors for candidates, rescored with full vectors afterwards
+            return {
+                "collection_name": self.collection_name,
+                "query_vector": NamedVector(
+                    name=MATRYOSHKA_VECTOR,
+                    vector=truncate_embeddings(query_embedding, self.matryoshka_dim).tolist()
+                ),
+                "limit": limit * self.matryoshka_oversample,
+                "query_filter": filter_query,
+                "search_params": search_params,
+                "with_payload": True,
+                "with_vectors": [FULL_VECTOR]
+            }
+        
+        if isinstance(query_embedding, np.ndarray):
+            query_embedding = query_embedding.tolist()
+        
+        return {
+            "collection_name": self.collection_name,
+            "query_vector": query_embedding,
+            "limit": limit,
+            "score_threshold": score_threshold,
+            "query_filter": filter_query,
+            "search_params": search_params,
+            "with_payload": True,
+            "with_vectors": False
+        }
+    
+    def _finish_search(self, search_result: List[Any], query_embedding: Union[np.ndarray, List[float]],
+                       limit: int, score_threshold: float) -> List[Dict[str, Any]]:
+        """Rescore Matryoshka candidates if needed and convert points to the standard format."""
+        if self.matryoshka_enabled:
+            search_result = self._rescore_candidates(search_result, query_embedding, limit, score_threshold)
+        
+        # Convert results to standard format
+        results = []
+        for point in search_result:
+            result = {
+                "chunk_id": str(point.id),
+                "score": point.score,
+                "content": point.payload.get("content", ""),
+                "metadata": {
+                    "source": point.payload.get("source", ""),
+                    "chunk_index": point.payload.get("chunk_index", 0),
+                    "page_number": point.payload.get("page_number"),
+                    "type": point.payload.get("type"),
+                    "total_chunks": point.payload.get("total_chunks")
                 }
-                results.append(result)
-            
-            logger.debug(f"Found {len(results)} similar vectors")
-            return results
+            }
+            results.append(result)
+        
+        logger.debug(f"Found {len(results)} similar vectors")
+        return results
+    
+    def _rescore_candidates(self, candidates: List[Any], query_embedding: Union[np.ndarray, List[float]],
+                            limit: int, score_threshold: float) -> List[Any]:
+        """Rescore truncated-vector candidates with their full vectors."""
+        candidates = [point for point in candidates if point.vector and FULL_VECTOR in point.vector]
+        if not candidates:
+            return []
+        
+        scores = rescore(query_embedding, np.array([point.vector[FULL_VECTOR] for point in candidates]))
+        for point, score in zip(candidates, scores):
+            point.score = float(score)
+        
+        ranked = sorted(candidates, key=lambda point: point.score, reverse=True)
+        return [point for point in ranked if point.score >= score_threshold][:limit]
+    
+    def _get_async_client(self) -> AsyncQdrantClient:
+        """Get the async client, creating it on the running event loop."""
+        if self._async_client is None:
+            self._async_client = AsyncQdrantClient(
+                url=self.qdrant_config.get("url", "http://localhost:6333"),
+                prefer_grpc=self.qdrant_config.get("prefer_grpc", False),
+                grpc_port=self.qdrant_config.get("grpc_port", 6334),
+                timeout=int(self.call_timeout),
+                # REST connection pool; gRPC multiplexes calls over one channel
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            )
+            logger.info(f"Async Qdrant client created (grpc={self.qdrant_config.get('prefer_grpc', False)}, "
+                        f"pool={self.pool_size}, timeout={self.call_timeout}s)")
+        return self._async_client
+    
+    async def _call_async(self, method: str, **kwargs) -> Any:
+        """Await an async client call, bounded by the per-call timeout."""
+        client = self._get_async_client()
+        return await asyncio.wait_for(getattr(client, method)(**kwargs), timeout=self.call_timeout)
+    
+    async def search_similar_async(self, query_embedding: List[float], limit: int = 10,
+                                   score_threshold: float = 0.0,
+                                   filter_conditions: Dict[str, Any] = None,
+                                   hnsw_ef: Optional[int] = None,
+                                   rescore: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """Awaitable search_similar using the async client."""
+        try:
+            search_kwargs = self._search_kwargs(query_embedding, limit, score_threshold, filter_conditions,
+                                                hnsw_ef, rescore)
+            search_result = await self._call_async("search", **search_kwargs)
+            return self._finish_search(search_result, query_embedding, limit, score_threshold)
         
+        except asyncio.TimeoutError:
+            logger.error(f"Qdrant search timed out after {self.call_timeout}s")
+            return []
         except Exception as e:
             logger.error(f"Error searching similar vectors: {e}")
             return []
     
+    async def add_chunks_async(self, chunks: List[Dict[str, Any]], embeddings: Optional[np.ndarray] = None) -> bool:
+        """Awaitable add_chunks using the async client."""
+        if not chunks:
+            return True
+        
+        try:
+            if embeddings is not None:
+                rows = [chunk["embedding_row"] for chunk in chunks]
+                points = self._matrix_batch(
+                    [chunk.get("chunk_id") for chunk in chunks],
+                    embeddings[rows],
+                    [self.build_payload(chunk) for chunk in chunks]
+                )
+            else:
+                points = self._build_points(chunks)
+                if not points:
+                    logger.warning("No valid points to add to Qdrant")
+                    return False
+            
+            await self._call_async("upsert", collection_name=self.write_collection, points=points)
+            
+            logger.info(f"Successfully added {len(chunks)} chunks to Qdrant")
+            return True
+        
+        except asyncio.TimeoutError:
+            logger.error(f"Qdrant upsert timed out after {self.call_timeout}s")
+            return False
+        except Exception as e:
+            logger.error(f"Error adding chunks to Qdrant: {e}")
+            return False
+    
+    async def delete_chunks_by_source_async(self, source_path: str) -> bool:
+        """Awaitable delete_chunks_by_source using the async client."""
+        try:
+            await self._call_async(
+                "delete",
+                collection_name=self.write_collection,
+                points_selector=self._source_filter(source_path)
+            )
+            
+            logger.info(f"Deleted chunks from source: {source_path}")
+            return True
+        
+        except asyncio.TimeoutError:
+            logger.error(f"Qdrant delete timed out after {self.call_timeout}s")
+            return False
+        except Exception as e:
+            logger.error(f"Error deleting chunks from source {source_path}: {e}")
+            return False
+    
+    async def close_async(self):
+        """Close the async client."""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+    
     def get_collection_info(self) -> Dict[str, Any]:
         """Get information about the collection."""
         try:
             info = self.client.get_collection(self.collection_name)
+            aliases = self._get_aliases()
+            vectors = info.config.params.vectors
+            if isinstance(vectors, dict):
+                vectors = vectors.get(FULL_VECTOR) or next(iter(vectors.values()))
             return {
                 "name": self.collection_name,
+                "collection": aliases.get(self.collection_name, self.collection_name),
                 "points_count": info.points_count,
                 "segments_count": info.segments_count,
-                "vector_size": info.config.params.vectors.size,
-                "distance": info.config.params.vectors.distance.name,
-                "status": info.status.name
+                "vector_size": vectors.size,
+                "distance": vectors.distance.name,
+                "status": info.status.name,
+                "payload_indexes": {
+                    field: schema.data_type.value for field, schema in (info.payload_schema or {}).items()
+                },
+                "matryoshka_dim": self.matryoshka_dim if self.matryoshka_enabled else None
             }
         
         except Exception as e:
@@ -0,0 +1,141 @@
+"""Buffered, pipelined Qdrant upserts for the OptimAIze indexing pipeline."""
+
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from src.config.settings import config
+from src.utils.logger import logger
+from src.storage.qdrant_client import QdrantManager
+
+class QdrantUpsertWriter:
+    """Buffer points across files and upsert them in bounded, pipelined batches.
+
+    Batches are flushed when they reach qdrant.batch_size points or
+    max_batch_bytes of estimated request size, and sent with wait=False so
+    several can be in flight at once. close() drains the pipeline and
+    re-sends the last batch with wait=True: Qdrant applies updates in order,
+    so once that returns every earlier batch has been applied too.
+    """
+
+    def __init__(self, manager: QdrantManager, batch_size: int = None,
+                 max_batch_bytes: int = None, max_in_flight: int = None):
+        upsert_config = config.qdrant.get("upsert", {}) or {}
+        self.manager = manager
+        self.batch_size = batch_size or config.qdrant.get("batch_size", 100)
+        self.max_batch_bytes = max_batch_bytes or upsert_config.get("max_batch_bytes", 4 * 1024 * 1024)
+        self.max_in_flight = max_in_flight or upsert_config.get("max_in_flight", 4)
+
+        # JSON floats take roughly 10 bytes over REST, 4 over gRPC
+        self._bytes_per_float = 4 if config.qdrant.get("prefer_grpc", False) else 10
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="qdrant-upsert")
+        self._in_flight: deque = deque()
+        self._last_batch: Optional[Tuple[List[str], np.ndarray, List[Dict[str, Any]]]] = None
+        self._closed = False
+
+        # Pending batch
+        self._ids: List[str] = []
+        self._vectors: List[np.ndarray] = []
+        self._payloads: List[Dict[str, Any]] = []
+        self._pending_bytes = 0
+
+        # Stats
+        self.points_sent = 0
+        self.points_failed = 0
+        self.batches_sent = 0
+        self.failed_sources = set()
+        self._start_time = time.time()
+
+    def add(self, chunks: List[Dict[str, Any]], embeddings: np.ndarray) -> bool:
+        """Buffer chunks whose vectors are rows of embeddings, flushing full batches."""
+        if self._closed:
+            raise RuntimeError("QdrantUpsertWriter is closed")
+
+        for chunk in chunks:
+            vector = embeddings[chunk["embedding_row"]]
+            payload = self.manager.build_payload(chunk)
+
+            self._ids.append(chunk.get("chunk_id"))
+            self._vectors.append(vector)
+            self._payloads.append(payload)
+            self._pending_bytes += vector.size * self._bytes_per_float + len(payload.get("content", "")) + 512
+
+            if len(self._ids) >= self.batch_size or self._pending_bytes >= self.max_batch_bytes:
+                self._flush()
+
+        return True
+
+    def _flush(self):
+        """Send the pending batch without waiting for it to be applied."""
+        if not self._ids:
+            return
+
+        batch = (self._ids, np.vstack(self._vectors), self._payloads)
+        self._ids, self._vectors, self._payloads = [], [], []
+        self._pending_bytes = 0
+
+        # Bound the number of requests in flight
+        while len(self._in_flight) >= self.max_in_flight:
+            self._collect(*self._in_flight.popleft())
+
+        future = self._executor.submit(self.manager.upsert_matrix, *batch, False)
+        self._in_flight.append((future, batch))
+        self._last_batch = batch
+
+    def _collect(self, future: Future, batch: Tuple[List[str], np.ndarray, List[Dict[str, Any]]]):
+        """Wait for an in-flight batch and record its outcome."""
+        ids, _, payloads = batch
+        try:
+            future.result()
+            self.points_sent += len(ids)
+            self.batches_sent += 1
+        except Exception as e:
+            logger.error(f"Error upserting batch of {len(ids)} points to Qdrant: {e}")
+            self.points_failed += len(ids)
+            self.failed_sources.update(payload.get("source", "") for payload in payloads)
+
+    def close(self) -> Dict[str, Any]:
+        """Flush remaining points, wait for every batch and confirm they were applied."""
+        if self._closed:
+            return self.get_stats()
+
+        try:
+            self._flush()
+            while self._in_flight:
+                self._collect(*self._in_flight.popleft())
+
+            # Durability barrier: upserts are idempotent, so re-send the last batch and wait
+            if self._last_batch is not None and self.points_sent:
+                try:
+                    self.manager.upsert_matrix(*self._last_batch, True)
+                except Exception as e:
+                    logger.error(f"Qdrant durability barrier failed: {e}")
+                    ids, _, payloads = self._last_batch
+                    self.points_failed += len(ids)
+                    self.failed_sources.update(payload.get("source", "") for payload in payloads)
+        finally:
+            self._executor.shutdown(wait=True)
+            self._closed = True
+
+        stats = self.get_stats()
+        logger.info(f"Qdrant upserts complete: {stats['points_sent']} points in {stats['batches_sent']} batches, "
+                    f"{stats['points_per_sec']:.0f} points/s")
+        return stats
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get throughput and failure counts."""
+        elapsed = time.time() - self._start_time
+        return {
+            "points_sent": self.points_sent,
+            "points_failed": self.points_failed,
+            "batches_sent": self.batches_sent,
+            "in_flight": len(self._in_flight),
+            "pending_points": len(self._ids),
+            "failed_sources": sorted(self.failed_sources),
+            "elapsed_seconds": elapsed,
+            "points_per_sec": self.points_sent / elapsed if elapsed > 0 else 0.0
+        }